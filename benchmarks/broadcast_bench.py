@@ -0,0 +1,150 @@
+"""
+Пропускная способность рассылки через фоновый воркер против заглушки Bot API.
+Для каждого размера аудитории заново наполняет локальную БД пользователями,
+ставит задание рассылки (как confirm_broadcast) и ждёт его завершения.
+
+Запуск из корня проекта:
+    python -m benchmarks.broadcast_bench --sizes 1000,10000 --rate 1000
+    python -m benchmarks.broadcast_bench --sizes 100000 --rate 5000 --latency-ms 50 --forbidden-rate 0.02
+    python -m benchmarks.broadcast_bench --sizes 1000 --rate 25 --retry-after-rate 0.01   # реальный лимит и 429
+
+Замер очищает users и таблицы рассылок, поэтому БД из .env и DOCKER_DB_URL не используется:
+по умолчанию — временная SQLite, другая отдельная БД задаётся только явно через --db.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import resource
+import statistics
+import tempfile
+import time
+import uuid
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def rss_mb() -> float:
+    # ru_maxrss в Linux — килобайты, пиковое значение за всё время процесса
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def bench(args):
+    # Настройки читаются при импорте, поэтому модули бота импортируются после окружения
+    from aiogram import Bot
+    from aiogram.client.telegram import TelegramAPIServer
+    from sqlalchemy import delete, func
+    from sqlalchemy.future import select
+
+    from benchmarks.mock_bot_api import MockBotAPI
+    from config import settings
+    from database.engine import engine, AsyncSessionLocal
+    from database.models import Base, User, BroadcastJob, BroadcastDelivery
+    from services.broadcast_jobs import create_job, broadcast_worker
+    from services.metrics import MetricsSession
+
+    latencies: list[float] = []
+
+    class RecordingSession(MetricsSession):
+        """Сессия бота, запоминающая задержку каждого sendMessage"""
+
+        async def make_request(self, bot, method, timeout=None):
+            started = time.perf_counter()
+            try:
+                return await super().make_request(bot, method, timeout)
+            finally:
+                if method.__api_method__ == "sendMessage":
+                    latencies.append((time.perf_counter() - started) * 1000)
+
+    api = MockBotAPI(port=args.port, latency=args.latency_ms / 1000, jitter=args.latency_ms / 1000,
+                     retry_after_rate=args.retry_after_rate, forbidden_rate=args.forbidden_rate)
+    await api.start()
+    bot = Bot(settings.TOKEN, session=RecordingSession(api=TelegramAPIServer.from_base(settings.BOT_API_SERVER)))
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    print(f"Лимит: {settings.BROADCAST_RATE:.0f} сообщений/с, воркеров: {settings.BROADCAST_WORKERS}, "
+          f"задержка API: {args.latency_ms} мс (+ до {args.latency_ms} мс), 429: {args.retry_after_rate:.2%}, "
+          f"403: {args.forbidden_rate:.2%}, БД: {engine.dialect.name}")
+    await broadcast_worker.start(bot)
+    try:
+        for size in args.sizes:
+            async with engine.begin() as conn:
+                for model in (BroadcastDelivery, BroadcastJob, User):
+                    await conn.execute(delete(model))
+                for start in range(0, size, 10000):
+                    await conn.execute(User.__table__.insert(), [
+                        {"tg_id": 1_000_000 + i, "first_name": f"user{i}", "is_active": True}
+                        for i in range(start, min(size, start + 10000))
+                    ])
+            latencies.clear()
+            rss_before = rss_mb()
+
+            job_id = str(uuid.uuid4())[:8]
+            started = time.perf_counter()
+            await create_job(job_id, next(iter(settings.ADMINS)), {
+                "content_type": "text", "text": "Тестовая рассылка", "broadcast_type": "all",
+            })
+            broadcast_worker.submit()
+            while True:
+                await asyncio.sleep(0.2)
+                async with AsyncSessionLocal() as session:
+                    job = await session.get(BroadcastJob, job_id)
+                    if job.status == "done":
+                        break
+            elapsed = time.perf_counter() - started
+
+            async with AsyncSessionLocal() as session:
+                blocked = await session.scalar(
+                    select(func.count()).select_from(BroadcastDelivery)
+                    .where(BroadcastDelivery.job_id == job_id, BroadcastDelivery.status == "blocked")
+                )
+            print(f"\nПолучателей: {size}")
+            print(f"  Доставлено: {job.success_count}, ошибок: {job.fail_count} (заблокировали бота: {blocked})")
+            print(f"  Время: {elapsed:.1f} с, скорость: {job.success_count / elapsed:.0f} сообщений/с")
+            if latencies:
+                print(f"  Задержка sendMessage: p50={statistics.median(latencies):.1f} мс, "
+                      f"p99={percentile(latencies, 0.99):.1f} мс")
+            print(f"  Память (пик RSS): {rss_mb():.0f} МБ, прирост за прогон: {rss_mb() - rss_before:.0f} МБ")
+        print(f"\nОтветы заглушки: {dict(api.responses)}")
+    finally:
+        await broadcast_worker.stop()
+        await bot.session.close()
+        await api.stop()
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000", help="размеры аудитории через запятую")
+    parser.add_argument("--rate", type=float, default=1000, help="BROADCAST_RATE, сообщений в секунду")
+    parser.add_argument("--workers", type=int, default=20, help="BROADCAST_WORKERS")
+    parser.add_argument("--latency-ms", type=float, default=30)
+    parser.add_argument("--retry-after-rate", type=float, default=0.0, help="доля ответов 429")
+    parser.add_argument("--forbidden-rate", type=float, default=0.01, help="доля заблокировавших бота")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--db", help="URL отдельной БД для замера, users и таблицы рассылок в ней будут очищены")
+    args = parser.parse_args()
+    args.sizes = [int(size) for size in args.sizes.split(",")]
+
+    os.environ.setdefault("TOKEN", "123456:benchmark")
+    # Никогда не берём рабочую БД из .env: config.py предпочитает DOCKER_DB_URL, а load_dotenv его не перезапишет
+    os.environ["DOCKER_DB_URL"] = ""
+    os.environ["DB_REPLICA_URL"] = ""
+    os.environ["DB_URL"] = args.db or f"sqlite+aiosqlite:///{tempfile.gettempdir()}/broadcast_bench.db"
+    os.environ.setdefault("ADMINS", "1")
+    os.environ["BOT_API_SERVER"] = f"http://127.0.0.1:{args.port}"
+    os.environ["BROADCAST_RATE"] = str(args.rate)
+    os.environ["BROADCAST_WORKERS"] = str(args.workers)
+    # В выводе только итог замера: заглушка намеренно отвечает 403 и 429, и сводки ошибок доставки
+    # вместе с предупреждениями о флуд-контроле перемешались бы с таблицей
+    logging.disable(logging.ERROR)
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
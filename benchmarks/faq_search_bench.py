@@ -0,0 +1,60 @@
+"""
+Замер задержки поиска по FAQ (инвертированный индекс в памяти).
+
+Запуск из корня проекта:
+    python -m benchmarks.faq_search_bench --faqs 500 --queries 2000
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("TOKEN", "0:benchmark")
+os.environ.setdefault("DB_URL", "sqlite+aiosqlite:///:memory:")
+
+from services.faq_cache import FAQItem
+from services.faq_search import InvertedIndex
+
+VOCABULARY = (
+    "экзамен пересдача стипендия общежитие расписание сессия зачёт деканат справка практика "
+    "диплом курсовая преподаватель аудитория библиотека пропуск военкомат академический отпуск "
+    "перевод бюджет договор оплата рейтинг олимпиада конференция профком староста лекция семинар"
+).split()
+
+
+def make_text(words: int) -> str:
+    return " ".join(random.choice(VOCABULARY) for _ in range(words))
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--faqs", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    items = [FAQItem(i, make_text(8), make_text(60)) for i in range(1, args.faqs + 1)]
+    started = time.perf_counter()
+    index = InvertedIndex(items)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    latencies = []
+    for _ in range(args.queries):
+        query = make_text(random.randint(5, 25))
+        started = time.perf_counter()
+        index.search(query, 3)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    print(f"FAQ: {args.faqs}, запросов: {args.queries}")
+    print(f"Построение индекса: {build_ms:.1f} мс")
+    print(f"Поиск: p50={statistics.median(latencies):.3f} мс, "
+          f"p99={percentile(latencies, 0.99):.3f} мс, max={max(latencies):.3f} мс")
+
+
+if __name__ == "__main__":
+    main()
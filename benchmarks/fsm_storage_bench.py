@@ -0,0 +1,85 @@
+"""
+Сравнение накладных расходов FSM на одно обновление: MemoryStorage и SQLAlchemyStorage.
+Обновление имитирует шаг диалога: чтение состояния диспетчером, чтение данных,
+update_data и set_state в обработчике.
+
+Запуск из корня проекта:
+    python -m benchmarks.fsm_storage_bench --users 200 --updates 2000
+
+Замер очищает таблицу fsm_state, поэтому БД из .env и DOCKER_DB_URL не используется:
+по умолчанию — временная SQLite, другая отдельная БД задаётся только явно через --db.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+STATES = ["AskQuestion:waiting_for_question", "AskQuestion:waiting_for_anon_choice", None]
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def run(storage, keys: list, updates: int) -> list[float]:
+    latencies = []
+    for i in range(updates):
+        key = random.choice(keys)
+        started = time.perf_counter()
+        await storage.get_state(key)
+        await storage.get_data(key)
+        await storage.update_data(key, {"question": f"вопрос {i}"})
+        await storage.set_state(key, random.choice(STATES))
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+async def bench(args):
+    from aiogram.fsm.storage.base import StorageKey
+    from aiogram.fsm.storage.memory import MemoryStorage
+
+    from database.engine import engine
+    from database.fsm_storage import SQLAlchemyStorage
+    from database.models import Base, FSMState
+
+    engine.echo = False
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(FSMState.__table__.delete())
+
+    keys = [StorageKey(bot_id=1, chat_id=user_id, user_id=user_id) for user_id in range(1, args.users + 1)]
+    storages = {
+        "memory": MemoryStorage(),
+        "db, без кэша": SQLAlchemyStorage(state_ttl=3600, cache_ttl=0, cleanup_interval=600),
+        "db, кэш 1 с": SQLAlchemyStorage(state_ttl=3600, cache_ttl=1.0, cleanup_interval=600),
+    }
+    print(f"Пользователей: {args.users}, обновлений: {args.updates}, БД: {engine.dialect.name}")
+    for name, storage in storages.items():
+        latencies = await run(storage, keys, args.updates)
+        print(f"{name:>14}: p50={statistics.median(latencies):.3f} мс, "
+              f"p99={percentile(latencies, 0.99):.3f} мс, max={max(latencies):.3f} мс")
+        await storage.close()
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--db", help="URL отдельной БД для замера, таблица fsm_state в ней будет очищена")
+    args = parser.parse_args()
+
+    os.environ.setdefault("TOKEN", "0:benchmark")
+    # Никогда не берём рабочую БД из .env: config.py предпочитает DOCKER_DB_URL, а load_dotenv его не перезапишет
+    os.environ["DOCKER_DB_URL"] = ""
+    os.environ["DB_REPLICA_URL"] = ""
+    os.environ["DB_URL"] = args.db or f"sqlite+aiosqlite:///{tempfile.gettempdir()}/fsm_storage_bench.db"
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Нагрузочный тест диспетчера: виртуальные студенты одновременно проходят типичные сценарии
+(/start, «FAQ 📚», открытие ответа, вопрос с выбором анонимности, кнопка «Прочитал(-а)»),
+админы отвечают на вопросы. Обновления идут в Dispatcher.feed_update с настоящими роутерами
+из handlers/, Bot API подменён сессией без сети, БД — локальная.
+
+Запуск из корня проекта:
+    python -m benchmarks.load_bench --users 500 --concurrency 100
+    python -m benchmarks.load_bench --users 500 --api-latency-ms 50 --no-throttle
+
+Замер пересоздаёт все таблицы, поэтому БД из .env и DOCKER_DB_URL не используется:
+по умолчанию — временная SQLite, другая отдельная БД задаётся только явно через --db.
+"""
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+
+FIRST_USER_ID = 2_000_000
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+class UpdateFactory:
+    """Синтетические обновления Telegram от имени пользователя в личном чате"""
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+
+    def _user(self, user_id: int) -> dict:
+        return {"id": user_id, "is_bot": False, "first_name": f"Студент{user_id}", "username": f"student{user_id}"}
+
+    def message(self, user_id: int, text: str) -> dict:
+        update_id = next(self._ids)
+        return {"update_id": update_id, "message": {
+            "message_id": update_id, "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"}, "from": self._user(user_id), "text": text,
+        }}
+
+    def callback(self, user_id: int, data: str) -> dict:
+        update_id = next(self._ids)
+        return {"update_id": update_id, "callback_query": {
+            "id": str(update_id), "chat_instance": str(user_id), "from": self._user(user_id), "data": data,
+            "message": {
+                "message_id": update_id, "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"}, "text": "…",
+            },
+        }}
+
+
+async def bench(args):
+    # Настройки читаются при импорте, поэтому модули бота импортируются после окружения
+    from aiogram import Bot, BaseMiddleware
+    from aiogram.types import Update
+
+    import main
+    from benchmarks.mock_session import MockSession
+    from config import settings
+    from database.engine import engine, AsyncSessionLocal
+    from database.models import Base, FAQ, Question
+    from middlewares.db_session import track_checkouts, update_checkouts
+    from middlewares.throttling import throttling_middleware
+    from services.read_receipts import read_receipts
+
+    handler_latencies: dict[str, list[float]] = defaultdict(list)
+    handler_checkouts: dict[str, list[int]] = defaultdict(list)
+
+    class RecordingMiddleware(BaseMiddleware):
+        """Точное время каждого обработчика для процентилей и число взятых из пула соединений"""
+
+        async def __call__(self, handler, event, data):
+            started = time.perf_counter()
+            try:
+                return await handler(event, data)
+            finally:
+                name = data["handler"].callback.__name__
+                handler_latencies[name].append((time.perf_counter() - started) * 1000)
+                handler_checkouts[name].append(update_checkouts.get()[0])
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as session:
+        topics = ["стипендия", "общежитие", "пересдача", "расписание", "справка", "практика", "военкомат"]
+        session.add_all(FAQ(question=f"Как получить {topic} #{i}?", answer=f"Ответ про {topic}. " * 20)
+                        for i, topic in enumerate(topics * (args.faqs // len(topics) + 1)) if i < args.faqs)
+        questions = [Question(user_id=FIRST_USER_ID - 1 - i, username="seed", question=f"Вопрос {i}",
+                              is_anon=False, group_message_id=i + 1) for i in range(args.replies)]
+        session.add_all(questions)
+        await session.commit()
+        question_ids = [q.id for q in questions]
+
+    session = MockSession(latency=args.api_latency_ms / 1000)
+    bot = Bot(settings.TOKEN, session=session)
+    main.register_handlers()
+    track_checkouts(engine)
+    main.dp.message.middleware(RecordingMiddleware())
+    main.dp.callback_query.middleware(RecordingMiddleware())
+
+    factory = UpdateFactory()
+    admin_id = next(iter(settings.ADMINS))
+    update_latencies: list[float] = []
+
+    async def feed(update: dict):
+        started = time.perf_counter()
+        await main.dp.feed_update(bot, Update.model_validate(update, context={"bot": bot}))
+        update_latencies.append((time.perf_counter() - started) * 1000)
+
+    async def student(user_id: int):
+        faq_id = random.randint(1, args.faqs)
+        await feed(factory.message(user_id, "/start"))
+        await feed(factory.message(user_id, "FAQ 📚"))
+        await feed(factory.callback(user_id, f"faq_item_{faq_id}_0"))
+        if random.random() < args.ask_share:
+            await feed(factory.message(user_id, "Задать вопрос ✍️"))
+            await feed(factory.message(user_id, f"Когда будет {random.choice(topics)} в этом семестре?"))
+            await feed(factory.message(user_id, random.choice(["Анонимно 🤫", "Неанонимно 🙂"])))
+        await feed(factory.callback(user_id, "bcast_read_loadtest"))
+
+    async def admin_reply(question_id: int):
+        await feed(factory.callback(admin_id, f"reply_{question_id}"))
+        await feed(factory.message(admin_id, f"Ответ на вопрос {question_id}"))
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def limited(coro):
+        async with semaphore:
+            await coro
+
+    # Ответы одного админа идут последовательно: ожидание ответа хранится на админа
+    async def admin_session():
+        for question_id in question_ids:
+            await admin_reply(question_id)
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        admin_session(),
+        *(limited(student(FIRST_USER_ID + i)) for i in range(args.users)),
+    )
+    elapsed = time.perf_counter() - started
+    await read_receipts.flush()
+
+    print(f"Студентов: {args.users}, одновременно: {args.concurrency}, ответов админа: {args.replies}, "
+          f"задержка API: {args.api_latency_ms} мс, БД: {engine.dialect.name}")
+    print(f"Обновлений: {len(update_latencies)} за {elapsed:.1f} с — {len(update_latencies) / elapsed:.0f} обновлений/с")
+    print(f"Обновление целиком: p50={statistics.median(update_latencies):.2f} мс, "
+          f"p99={percentile(update_latencies, 0.99):.2f} мс")
+    print(f"Отброшено ограничением частоты: {throttling_middleware.dropped}")
+    print(f"\n{'обработчик':<24}{'вызовов':>8}{'p50, мс':>10}{'p99, мс':>10}{'max, мс':>10}{'соединений':>12}")
+    for name, values in sorted(handler_latencies.items(), key=lambda item: -len(item[1])):
+        print(f"{name:<24}{len(values):>8}{statistics.median(values):>10.2f}"
+              f"{percentile(values, 0.99):>10.2f}{max(values):>10.2f}"
+              f"{statistics.mean(handler_checkouts[name]):>12.2f}")
+    print(f"\nВызовы Bot API: {dict(session.calls)}")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--faqs", type=int, default=60)
+    parser.add_argument("--replies", type=int, default=50, help="сколько вопросов ответит админ")
+    parser.add_argument("--ask-share", type=float, default=0.3, help="доля студентов, задающих вопрос")
+    parser.add_argument("--api-latency-ms", type=float, default=0.0, help="задержка ответа Bot API")
+    parser.add_argument("--no-throttle", action="store_true", help="отключить ограничение частоты")
+    parser.add_argument("--db", help="URL отдельной БД для замера, все таблицы в ней будут пересозданы")
+    args = parser.parse_args()
+
+    os.environ.setdefault("TOKEN", "123456:benchmark")
+    # Никогда не берём рабочую БД из .env: config.py предпочитает DOCKER_DB_URL, а load_dotenv его не перезапишет
+    os.environ["DOCKER_DB_URL"] = ""
+    os.environ["DB_REPLICA_URL"] = ""
+    os.environ["DB_URL"] = args.db or f"sqlite+aiosqlite:///{tempfile.gettempdir()}/load_bench.db"
+    os.environ.setdefault("ADMINS", "1")
+    os.environ["METRICS_PORT"] = "0"
+    if args.no_throttle:
+        os.environ["RATE_LIMITS"] = ""
+    logging.disable(logging.INFO)  # Журнал каждого обновления искажает замер
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
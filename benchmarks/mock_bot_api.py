@@ -0,0 +1,108 @@
+"""
+Локальная заглушка Telegram Bot API для бенчмарков.
+Отвечает на методы отправки сообщений с заданной задержкой, может возвращать
+429 с retry_after и 403 «bot was blocked by the user».
+
+Отдельный запуск (бот направляется на неё через BOT_API_SERVER=http://127.0.0.1:8089):
+    python -m benchmarks.mock_bot_api --port 8089 --latency-ms 30 --forbidden-rate 0.01
+"""
+import argparse
+import asyncio
+import random
+import time
+import zlib
+from collections import Counter
+
+from aiohttp import web
+
+
+class MockBotAPI:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8089, latency: float = 0.0, jitter: float = 0.0,
+                 retry_after_rate: float = 0.0, retry_after: int = 1, forbidden_rate: float = 0.0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.retry_after_rate = retry_after_rate
+        self.retry_after = retry_after
+        self.forbidden_rate = forbidden_rate
+        self.calls = Counter()  # метод -> число запросов
+        self.responses = Counter()  # код ответа -> число
+        self._message_id = 0
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def is_forbidden(self, chat_id) -> bool:
+        # Один и тот же пользователь «заблокировал бота» во всех запросах
+        return zlib.crc32(str(chat_id).encode()) % 10000 < self.forbidden_rate * 10000
+
+    def _error(self, code: int, description: str, **parameters) -> web.Response:
+        self.responses[code] += 1
+        body = {"ok": False, "error_code": code, "description": description}
+        if parameters:
+            body["parameters"] = parameters
+        return web.json_response(body, status=code)
+
+    def _ok(self, result) -> web.Response:
+        self.responses[200] += 1
+        return web.json_response({"ok": True, "result": result})
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = dict(await request.post())
+        self.calls[method] += 1
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + random.random() * self.jitter)
+
+        if method == "getMe":
+            return self._ok({"id": 1, "is_bot": True, "first_name": "Mock", "username": "mock_bot"})
+        chat_id = params.get("chat_id")
+        if chat_id is None:
+            return self._ok(True)
+        if self.retry_after_rate and random.random() < self.retry_after_rate:
+            return self._error(429, f"Too Many Requests: retry after {self.retry_after}",
+                               retry_after=self.retry_after)
+        if self.is_forbidden(chat_id):
+            return self._error(403, "Forbidden: bot was blocked by the user")
+        if not method.startswith("send"):
+            return self._ok(True)
+        self._message_id += 1
+        return self._ok({
+            "message_id": self._message_id,
+            "date": int(time.time()),
+            "chat": {"id": int(chat_id), "type": "private"},
+            "text": params.get("text", ""),
+        })
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def serve():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=30)
+    parser.add_argument("--retry-after-rate", type=float, default=0.0)
+    parser.add_argument("--forbidden-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    api = MockBotAPI(port=args.port, latency=args.latency_ms / 1000, retry_after_rate=args.retry_after_rate,
+                     forbidden_rate=args.forbidden_rate)
+    await api.start()
+    print(f"Заглушка Bot API: {api.url}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve())
@@ -0,0 +1,43 @@
+"""Сессия бота без сети: отвечает на вызовы Bot API готовыми объектами, для нагрузочных тестов"""
+import asyncio
+from collections import Counter
+from datetime import datetime
+from typing import AsyncGenerator
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.types import Chat, Message, User
+
+
+class MockSession(BaseSession):
+    def __init__(self, latency: float = 0.0):
+        super().__init__()
+        self.latency = latency
+        self.calls = Counter()  # метод -> число вызовов
+        self._message_id = 0
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout: int | None = None):
+        name = method.__api_method__
+        self.calls[name] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if name == "getMe":
+            return User(id=bot.id, is_bot=True, first_name="Mock")
+        if name.startswith("send"):
+            self._message_id += 1
+            return Message(
+                message_id=self._message_id,
+                date=datetime.now(),
+                chat=Chat(id=int(method.chat_id), type="private"),
+                text=getattr(method, "text", None),
+            )
+        # Редактирование, ответы на нажатия и прочие методы возвращают True
+        return True
+
+    async def stream_content(self, url: str, headers: dict | None = None, timeout: int = 30,
+                             chunk_size: int = 65536, raise_for_status: bool = True) -> AsyncGenerator[bytes, None]:
+        yield b""
+
+    async def close(self):
+        pass
@@ -0,0 +1,121 @@
+"""
+Стоимость маршрутизации одного обновления: индекс обработчиков (INDEXED_ROUTING=true)
+против последовательной проверки фильтров. Обработчики не выполняются — замеряется
+путь от feed_update до выбора обработчика.
+
+Запуск из корня проекта (оба режима в отдельных процессах, роутеры собираются при импорте):
+    python -m benchmarks.routing_bench --rounds 2000 --repeat 5
+
+Режимы запускаются поочерёдно --repeat раз, по каждому сценарию берётся лучшая медиана:
+маршрутизация — десятки микросекунд из ~150 мкс на обновление, и один прогон сильно шумит.
+
+Замер создаёт таблицы, поэтому БД из .env и DOCKER_DB_URL не используется:
+по умолчанию — временная SQLite, другая отдельная БД задаётся только явно через --db.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.load_bench import UpdateFactory
+
+STUDENT_ID = 2_000_000
+
+# Типичные обновления: кнопки меню, нажатия inline-кнопок и произвольный текст студента
+SCENARIOS = {
+    "кнопка «FAQ 📚»": ("message", "FAQ 📚"),
+    "кнопка «О нас ℹ️»": ("message", "О нас ℹ️"),
+    "произвольный текст": ("message", "подскажите, где деканат?"),
+    "callback faq_item_": ("callback", "faq_item_12_11"),
+    "callback bcast_read_": ("callback", "bcast_read_ab12cd34"),
+    "callback repeat_": ("callback", "repeat_42"),
+}
+
+
+async def measure(rounds: int) -> dict[str, float]:
+    from aiogram import Bot, BaseMiddleware
+    from aiogram.types import Update
+
+    import main
+    from benchmarks.mock_session import MockSession
+    from database.engine import engine
+    from database.models import Base
+
+    class SkipHandler(BaseMiddleware):
+        """Останавливает обработку сразу после выбора обработчика"""
+
+        async def __call__(self, handler, event, data):
+            return None
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    main.register_handlers()
+    main.dp.message.middleware(SkipHandler())
+    main.dp.callback_query.middleware(SkipHandler())
+    bot = Bot("123456:benchmark", session=MockSession())
+    factory = UpdateFactory()
+
+    results = {}
+    for name, (kind, value) in SCENARIOS.items():
+        make = factory.message if kind == "message" else factory.callback
+        updates = [Update.model_validate(make(STUDENT_ID, value), context={"bot": bot}) for _ in range(rounds)]
+        latencies = []
+        for update in updates:
+            started = time.perf_counter()
+            await main.dp.feed_update(bot, update)
+            latencies.append((time.perf_counter() - started) * 1_000_000)
+        results[name] = statistics.median(latencies)
+    await engine.dispose()
+    return results
+
+
+def run_mode(indexed: bool, rounds: int) -> dict[str, float]:
+    env = dict(os.environ, INDEXED_ROUTING="true" if indexed else "false")
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.routing_bench", "--rounds", str(rounds), "--child",
+         "--db", os.environ["DB_URL"]],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3, help="сколько раз запускать каждый режим")
+    parser.add_argument("--db", help="URL отдельной БД для замера, в ней будут созданы таблицы")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    os.environ.setdefault("TOKEN", "123456:benchmark")
+    # Никогда не берём рабочую БД из .env: config.py предпочитает DOCKER_DB_URL, а load_dotenv его не перезапишет
+    os.environ["DOCKER_DB_URL"] = ""
+    os.environ["DB_REPLICA_URL"] = ""
+    os.environ["DB_URL"] = args.db or f"sqlite+aiosqlite:///{tempfile.gettempdir()}/routing_bench.db"
+    os.environ.setdefault("ADMINS", "1")
+    os.environ["METRICS_PORT"] = "0"
+    os.environ["RATE_LIMITS"] = ""  # Ограничение частоты отбросило бы повторы одного пользователя
+    if args.child:
+        logging.disable(logging.INFO)
+        print(json.dumps(asyncio.run(measure(args.rounds))))
+        return
+
+    plain, indexed = {}, {}
+    for _ in range(args.repeat):
+        for results, mode in ((plain, False), (indexed, True)):
+            for name, value in run_mode(mode, args.rounds).items():
+                results[name] = min(value, results.get(name, value))
+    print(f"Медиана времени маршрутизации, мкс ({args.rounds} обновлений на сценарий, лучший из {args.repeat} запусков)")
+    print(f"{'сценарий':<26}{'фильтры':>10}{'индекс':>10}{'ускорение':>11}")
+    for name in SCENARIOS:
+        print(f"{name:<26}{plain[name]:>10.1f}{indexed[name]:>10.1f}{plain[name] / indexed[name]:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Задержка приёма обновлений в режиме вебхука.
+Поднимает aiohttp-приложение из main.create_app на локальном порту и шлёт в него
+синтетические обновления — текст от обычных пользователей, который проходит через
+все роутеры и не вызывает Bot API.
+
+Запуск из корня проекта:
+    python -m benchmarks.webhook_bench --requests 2000 --concurrency 20
+    python -m benchmarks.webhook_bench --sync   # ответ только после обработки обновления
+
+Замер создаёт таблицы и пишет пользователей, поэтому БД из .env и DOCKER_DB_URL не используется:
+по умолчанию — временная SQLite, другая отдельная БД задаётся только явно через --db.
+Воркер рассылок, сервер метрик и установка вебхука при запуске не включаются.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def make_update(update_id: int) -> dict:
+    user_id = 10_000_000 + update_id % 1000
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Тест"},
+            "text": f"просто сообщение {update_id}",
+        },
+    }
+
+
+async def bench(args):
+    from aiohttp import ClientSession
+    from aiohttp.test_utils import TestServer
+
+    import main
+    from config import settings
+    from database.engine import engine
+    from database.fsm_storage import SQLAlchemyStorage
+    from database.models import Base
+    from services.ephemeral import sweeper
+    from services.read_receipts import read_receipts
+
+    # Из main.on_startup берём только то, что участвует в обработке обновлений:
+    # воркер рассылок подхватил бы задания из БД, а set_webhook обратился бы к Bot API
+    async def on_startup():
+        await read_receipts.start()
+        await sweeper.start()
+        if isinstance(main.dp.storage, SQLAlchemyStorage):
+            main.dp.storage.start_cleanup()
+
+    async def on_shutdown():
+        await read_receipts.stop()
+        await sweeper.stop()
+        await main.dp.storage.close()
+
+    engine.echo = False
+    logging.disable(logging.INFO)  # Журнал каждого обновления искажает замер
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    main.register_handlers()
+    main.dp.startup.register(on_startup)
+    main.dp.shutdown.register(on_shutdown)
+    server = TestServer(main.create_app(handle_in_background=not args.sync))
+    await server.start_server()
+    url = str(server.make_url(settings.WEBHOOK_PATH))
+    headers = {"X-Telegram-Bot-Api-Secret-Token": settings.WEBHOOK_SECRET}
+
+    latencies = []
+    counter = iter(range(1, args.requests + 1))
+
+    async def client(session: ClientSession):
+        for update_id in counter:
+            started = time.perf_counter()
+            async with session.post(url, json=make_update(update_id), headers=headers) as response:
+                assert response.status == 200, response.status
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    async with ClientSession() as session:
+        # Без секрета запрос отклоняется
+        async with session.post(url, json=make_update(0)) as response:
+            assert response.status == 401, response.status
+        started = time.perf_counter()
+        await asyncio.gather(*(client(session) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    await server.close()
+    await engine.dispose()
+    mode = "синхронно" if args.sync else "в фоне"
+    print(f"Запросов: {args.requests}, параллельно: {args.concurrency}, обработка {mode}")
+    print(f"Пропускная способность: {args.requests / elapsed:.0f} запросов/с")
+    print(f"Задержка: p50={statistics.median(latencies):.2f} мс, "
+          f"p99={percentile(latencies, 0.99):.2f} мс, max={max(latencies):.2f} мс")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--sync", action="store_true", help="обрабатывать обновление до ответа")
+    parser.add_argument("--db", help="URL отдельной БД для замера, в ней будут созданы таблицы")
+    args = parser.parse_args()
+
+    os.environ.setdefault("TOKEN", "123456:benchmark")
+    # Никогда не берём рабочую БД из .env: config.py предпочитает DOCKER_DB_URL, а load_dotenv его не перезапишет
+    os.environ["DOCKER_DB_URL"] = ""
+    os.environ["DB_REPLICA_URL"] = ""
+    os.environ["DB_URL"] = args.db or f"sqlite+aiosqlite:///{tempfile.gettempdir()}/webhook_bench.db"
+    os.environ["METRICS_PORT"] = "0"
+    os.environ.setdefault("WEBHOOK_SECRET", "benchmark-secret")
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
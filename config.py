@@ -6,8 +6,121 @@ load_dotenv()
 class Settings():
     TOKEN = os.getenv('TOKEN')
     DB_URL = os.getenv('DOCKER_DB_URL') or os.getenv('DB_URL')
+    # Реплика для /stats, /bstats и подсчёта получателей; пусто — запросы идут в основную базу
+    DB_REPLICA_URL = os.getenv('DB_REPLICA_URL', '')
     GROUP_CHAT_ID = int(os.getenv('GROUP_CHAT_ID', '-1000000000000'))
     ADMINS = set(map(int, os.getenv('ADMINS', '').split(','))) if os.getenv('ADMINS') else set()
 
+    # Пул соединений с БД: размер, сверх размера, ожидание свободного соединения и пересоздание (сек)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    # Проверка соединения перед выдачей из пула (после рестарта PostgreSQL)
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    # Кэш подготовленных выражений asyncpg на соединение (0 — выключить, нужно для pgbouncer)
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', '500'))
+    # Логировать каждый SQL-запрос (только для отладки, записи идут через очередь журнала)
+    DB_ECHO = os.getenv('DB_ECHO', 'false').lower() in ('1', 'true', 'yes')
+
+    # Рассылки: глобальный лимит сообщений в секунду, число воркеров и интервал между сообщениями в один чат
+    BROADCAST_RATE = float(os.getenv('BROADCAST_RATE', '25'))
+    BROADCAST_WORKERS = int(os.getenv('BROADCAST_WORKERS', '20'))
+    BROADCAST_CHAT_INTERVAL = float(os.getenv('BROADCAST_CHAT_INTERVAL', '1.0'))
+    # Задания рассылок: размер порции между сохранениями курсора, опрос очереди и аренда задания (сек)
+    BROADCAST_CHECKPOINT_SIZE = int(os.getenv('BROADCAST_CHECKPOINT_SIZE', '200'))
+    BROADCAST_POLL_INTERVAL = float(os.getenv('BROADCAST_POLL_INTERVAL', '5'))
+    BROADCAST_LEASE = float(os.getenv('BROADCAST_LEASE', '60'))
+    # Как часто внутри порции сохранять доставки (сек): после сбоя повторно получат сообщение
+    # только те, кому оно ушло за последний такой интервал
+    BROADCAST_SAVE_INTERVAL = float(os.getenv('BROADCAST_SAVE_INTERVAL', '1.0'))
+    # Сколько заблокировавших бота пользователей отключать одним UPDATE
+    BROADCAST_DEACTIVATE_BATCH = int(os.getenv('BROADCAST_DEACTIVATE_BATCH', '100'))
+
+    # Кэш FAQ: через сколько секунд перечитать из БД (0 — только после правок в админ-панели)
+    FAQ_CACHE_TTL = float(os.getenv('FAQ_CACHE_TTL', '300'))
+    # Сколько вопросов FAQ показывать на одной странице
+    FAQ_PAGE_SIZE = int(os.getenv('FAQ_PAGE_SIZE', '8'))
+    # Поиск по FAQ перед отправкой вопроса: auto (PostgreSQL — полнотекстовый, иначе в памяти), postgres или memory
+    FAQ_SEARCH_BACKEND = os.getenv('FAQ_SEARCH_BACKEND', 'auto')
+    FAQ_SEARCH_WARN_MS = float(os.getenv('FAQ_SEARCH_WARN_MS', '20'))
+
+    # Кэш профилей для /start: сколько пользователей помнить и сколько секунд доверять записи.
+    # Отключение заблокировавших бота на другом экземпляре этот кэш не видит: пока запись свежая,
+    # вернувшийся пользователь не включается обратно в рассылки. Поэтому TTL — секунды, не часы
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '10000'))
+    USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', '30'))
+
+    # Сколько секунд /stats отдаёт один и тот же снимок статистики
+    STATS_CACHE_TTL = float(os.getenv('STATS_CACHE_TTL', '30'))
+    # Сколько секунд хранятся множества пользователей для сегментов рассылки
+    SEGMENT_CACHE_TTL = float(os.getenv('SEGMENT_CACHE_TTL', '60'))
+
+    # Отметки «Прочитал(-а)»: как часто сбрасывать буфер в БД (сек) и сколько строк в одном INSERT
+    READ_RECEIPTS_FLUSH_INTERVAL = float(os.getenv('READ_RECEIPTS_FLUSH_INTERVAL', '1.0'))
+    READ_RECEIPTS_BATCH = int(os.getenv('READ_RECEIPTS_BATCH', '1000'))
+
+    # Хранилище FSM: 'memory' — в процессе, 'db' — таблица fsm_state (общая для нескольких экземпляров)
+    FSM_STORAGE = os.getenv('FSM_STORAGE', 'memory')
+    # Время жизни состояния без изменений, кэш чтений и период очистки просроченных записей (сек).
+    # Кэш чтений не видит изменений с других экземпляров: за балансировщиком соседние обновления
+    # пользователя прочитают устаревшее состояние. Больше 0 — только для одного экземпляра
+    FSM_STATE_TTL = float(os.getenv('FSM_STATE_TTL', '86400'))
+    FSM_CACHE_TTL = float(os.getenv('FSM_CACHE_TTL', '0'))
+    FSM_CLEANUP_INTERVAL = float(os.getenv('FSM_CLEANUP_INTERVAL', '600'))
+
+    # Временные значения (антиспам вопросов, ожидание ответа админа): 'memory' или 'db' (общие для экземпляров)
+    EPHEMERAL_BACKEND = os.getenv('EPHEMERAL_BACKEND', 'memory')
+    EPHEMERAL_MAX_SIZE = int(os.getenv('EPHEMERAL_MAX_SIZE', '100000'))
+    EPHEMERAL_SWEEP_INTERVAL = float(os.getenv('EPHEMERAL_SWEEP_INTERVAL', '60'))
+    # Интервал между вопросами одного пользователя и сколько админ может готовить ответ (сек)
+    QUESTION_INTERVAL = int(os.getenv('QUESTION_INTERVAL', '60'))
+    REPLY_WAITING_TTL = float(os.getenv('REPLY_WAITING_TTL', '3600'))
+
+    # Ограничение частоты обновлений от пользователя по группам: '<группа>=<токенов в сек>:<размер ведра>'
+    RATE_LIMITS = os.getenv(
+        'RATE_LIMITS', 'messages=1:5,questions=0.5:3,faq=2:10,callbacks=2:10,admin=20:50'
+    )
+    # 'drop' — отбрасывать лишние обновления, 'delay' — ждать токен не дольше RATE_LIMIT_MAX_DELAY сек
+    RATE_LIMIT_MODE = os.getenv('RATE_LIMIT_MODE', 'drop')
+    RATE_LIMIT_MAX_DELAY = float(os.getenv('RATE_LIMIT_MAX_DELAY', '2'))
+    RATE_LIMIT_MAX_USERS = int(os.getenv('RATE_LIMIT_MAX_USERS', '50000'))
+
+    # Адрес Bot API, например локальный telegram-bot-api или заглушка для бенчмарков; пусто — api.telegram.org
+    BOT_API_SERVER = os.getenv('BOT_API_SERVER', '')
+
+    # Эндпоинт /metrics в формате Prometheus; порт 0 — выключен
+    METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+    METRICS_PORT = int(os.getenv('METRICS_PORT', '9101'))
+
+    # Поиск обработчиков кнопок по хэш-таблице текстов и callback_data вместо перебора фильтров
+    INDEXED_ROUTING = os.getenv('INDEXED_ROUTING', 'true').lower() in ('1', 'true', 'yes')
+
+    # Журнал: уровень, формат ('json' или 'text') и период сводок частых событий (сек)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+    LOG_SAMPLE_INTERVAL = float(os.getenv('LOG_SAMPLE_INTERVAL', '60'))
+
+    # Профилирование обновлений (меняется на ходу командой /profile): включено ли при запуске,
+    # порог медленного обновления (сек), доля обновлений под cProfile (%) и период снятия стеков (сек)
+    PROFILE_ENABLED = os.getenv('PROFILE_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    PROFILE_THRESHOLD = float(os.getenv('PROFILE_THRESHOLD', '1.0'))
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+    PROFILE_STACK_INTERVAL = float(os.getenv('PROFILE_STACK_INTERVAL', '0.02'))
+    # Каталог профилей и сколько последних файлов в нём хранить (не меньше 1)
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+    PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', '200'))
+
+    # Режим получения обновлений: 'polling' или 'webhook' (несколько экземпляров за балансировщиком)
+    BOT_MODE = os.getenv('BOT_MODE', 'polling')
+    # Публичный адрес бота без пути, например https://bot.example.com; пусто — вебхук ставится вручную
+    WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')
+    WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/webhook')
+    # Секрет из заголовка X-Telegram-Bot-Api-Secret-Token, запросы без него отклоняются.
+    # Обязателен в режиме webhook (1-256 символов: A-Z, a-z, 0-9, _ и -), без него бот не запустится
+    WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', '')
+    WEBAPP_HOST = os.getenv('WEBAPP_HOST', '0.0.0.0')
+    WEBAPP_PORT = int(os.getenv('WEBAPP_PORT', '8080'))
+
 
 settings = Settings()
\ No newline at end of file
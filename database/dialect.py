@@ -0,0 +1,9 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from database.engine import engine
+
+
+def insert(model):
+    """INSERT с поддержкой ON CONFLICT для текущей СУБД (PostgreSQL или SQLite)"""
+    if engine.dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
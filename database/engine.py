@@ -1,10 +1,46 @@
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from config import settings
+from database.pool import InstrumentedPool
 
-engine = create_async_engine(settings.DB_URL, echo=True)
+
+def engine_options(url: str) -> dict:
+    """Параметры движка и пула соединений из Settings"""
+    url = make_url(url)
+    # DB_ECHO включает логгер sqlalchemy.engine в setup_logging: echo=True писал бы в stdout синхронно
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    # SQLite в памяти живёт в одном соединении, пул для него не настраивается
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+    options.update(
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    if url.get_driver_name() == "asyncpg":
+        # Кэш подготовленных выражений на соединение; 0 — для pgbouncer в режиме transaction
+        options["connect_args"] = {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    return options
+
+
+engine = create_async_engine(settings.DB_URL, **engine_options(settings.DB_URL))
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Реплика для тяжёлых аналитических чтений; без DB_REPLICA_URL — основная база
+replica_engine = (
+    create_async_engine(settings.DB_REPLICA_URL, **engine_options(settings.DB_REPLICA_URL))
+    if settings.DB_REPLICA_URL else engine
+)
+AnalyticsSessionLocal = sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+
 async def get_session():
     async with AsyncSessionLocal() as session:
         yield session
+
+async def get_analytics_session():
+    """Сессия только для чтения статистики: данные на реплике могут отставать на секунды"""
+    async with AnalyticsSessionLocal() as session:
+        yield session
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Mapping, Optional
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StorageKey, StateType, DefaultKeyBuilder, KeyBuilder
+from sqlalchemy import JSON, case, delete, literal, null
+from sqlalchemy.future import select
+
+from database.dialect import insert
+from database.engine import AsyncSessionLocal
+from database.models import FSMState
+
+logger = logging.getLogger(__name__)
+
+
+class SQLAlchemyStorage(BaseStorage):
+    """
+    Хранилище FSM в таблице fsm_state.
+    Записи живут state_ttl секунд с последнего изменения, просроченные удаляет фоновая очистка.
+    Чтения кэшируются в памяти на cache_ttl секунд: за одно обновление состояние читается
+    несколько раз. Кэш одного экземпляра не видит записей других, поэтому при нескольких
+    экземплярах без привязки пользователя к экземпляру cache_ttl должен быть 0.
+    """
+
+    def __init__(self, state_ttl: float, cache_ttl: float, cleanup_interval: float,
+                 key_builder: KeyBuilder | None = None, cache_size: int = 10000):
+        self.state_ttl = state_ttl
+        self.cache_ttl = cache_ttl
+        self.cleanup_interval = cleanup_interval
+        self.key_builder = key_builder or DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, tuple[Optional[str], Dict[str, Any], float]] = OrderedDict()
+        self._cleanup_task: asyncio.Task | None = None
+
+    # --- Кэш чтений ---
+    def _cached(self, key: str):
+        entry = self._cache.get(key)
+        if entry is None or time.monotonic() - entry[2] > self.cache_ttl:
+            return None
+        return entry
+
+    def _remember(self, key: str, state: Optional[str], data: Dict[str, Any]):
+        if not self.cache_ttl:
+            return
+        self._cache[key] = (state, data, time.monotonic())
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _load(self, key: str) -> tuple[Optional[str], Dict[str, Any]]:
+        entry = self._cached(key)
+        if entry is not None:
+            return entry[0], entry[1]
+        async with AsyncSessionLocal() as session:
+            row = (await session.execute(
+                select(FSMState.state, FSMState.data)
+                .where(FSMState.key == key, FSMState.expires_at > datetime.utcnow())
+            )).first()
+        state, data = (row.state, dict(row.data or {})) if row else (None, {})
+        self._remember(key, state, data)
+        return state, data
+
+    async def _save(self, key: str, **values):
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.state_ttl)
+        stmt = insert(FSMState).values(key=key, state=values.get("state"), data=values.get("data", {}),
+                                      expires_at=expires_at)
+        # Просроченная запись, которую ещё не удалила очистка, считается отсутствующей:
+        # вторая колонка сбрасывается, а не оживает вместе с продлением срока
+        expired = FSMState.expires_at <= now
+        updates = dict(values)
+        if "state" not in updates:
+            updates["state"] = case((expired, null()), else_=FSMState.state)
+        if "data" not in updates:
+            updates["data"] = case((expired, literal({}, JSON)), else_=FSMState.data)
+        stmt = stmt.on_conflict_do_update(index_elements=[FSMState.key], set_={**updates, "expires_at": expires_at})
+        async with AsyncSessionLocal() as session:
+            await session.execute(stmt)
+            await session.commit()
+
+    # --- BaseStorage ---
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        storage_key = self.key_builder.build(key)
+        state = state.state if isinstance(state, State) else state
+        await self._save(storage_key, state=state)
+        entry = self._cached(storage_key)
+        if entry is not None:
+            self._remember(storage_key, state, entry[1])
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        state, _ = await self._load(self.key_builder.build(key))
+        return state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            raise TypeError(f"Data must be a dict, got {type(data).__name__}")
+        storage_key = self.key_builder.build(key)
+        await self._save(storage_key, data=dict(data))
+        entry = self._cached(storage_key)
+        if entry is not None:
+            self._remember(storage_key, entry[0], dict(data))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        _, data = await self._load(self.key_builder.build(key))
+        return data.copy()
+
+    # --- Очистка просроченных записей ---
+    async def cleanup(self) -> int:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(delete(FSMState).where(FSMState.expires_at <= datetime.utcnow()))
+            await session.commit()
+        return result.rowcount
+
+    async def _cleanup_loop(self):
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            try:
+                removed = await self.cleanup()
+                if removed:
+                    logger.info("Удалено просроченных состояний FSM: %s", removed)
+            except Exception as e:
+                logger.error("Не удалось очистить состояния FSM: %s", e)
+
+    def start_cleanup(self):
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+
+    async def close(self) -> None:
+        if self._cleanup_task:
+            self._cleanup_task.cancel()
+            try:
+                await self._cleanup_task
+            except asyncio.CancelledError:
+                pass
+            self._cleanup_task = None
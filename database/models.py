@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, BigInteger, Text, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, BigInteger, Text, DateTime, JSON, UniqueConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -12,7 +12,7 @@ class User(Base):
     username = Column(String, nullable=True)
     first_name = Column(String, nullable=True)
     last_name = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = Column(Boolean, default=True)  # Для возможности исключить из рассылки
 
@@ -20,7 +20,7 @@ class User(Base):
 class Question(Base):
     __tablename__ = 'questions'
     id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(BigInteger, nullable=False)
+    user_id = Column(BigInteger, nullable=False, index=True)  # Сегмент «задавали вопросы»
     username = Column(String, nullable=True)
     question = Column(String, nullable=False)
     is_anon = Column(Boolean, default=True)
@@ -40,8 +40,60 @@ class FAQ(Base):
 class BroadcastInteraction(Base):
     """Таблица для отслеживания взаимодействий с рассылками"""
     __tablename__ = 'broadcast_interactions'
+    __table_args__ = (
+        # Для /bstats: подсчёт и последние прочитавшие конкретной рассылки
+        Index('ix_broadcast_interactions_report', 'broadcast_id', 'action', 'created_at'),
+        # Одно действие пользователя на рассылку: защищает от двойных нажатий
+        UniqueConstraint('user_id', 'broadcast_id', 'action', name='uq_broadcast_interaction'),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(BigInteger, nullable=False, index=True)
     broadcast_id = Column(String, nullable=False, index=True)  # Уникальный ID рассылки
     action = Column(String, nullable=False)  # 'opened', 'clicked', 'confirmed' и т.д.
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class BroadcastJob(Base):
+    """Задание рассылки: контент из FSM и курсор, чтобы продолжить после перезапуска"""
+    __tablename__ = 'broadcast_jobs'
+    id = Column(String, primary_key=True)  # Совпадает с ID рассылки
+    created_by = Column(BigInteger, nullable=False)
+    broadcast_type = Column(String, nullable=False)  # 'test', 'all' или 'segment'
+    payload = Column(JSON, nullable=False)  # Данные FSM: тип контента, file_id, текст, отслеживание
+    status = Column(String, nullable=False, default='pending', index=True)  # 'pending', 'running', 'done'
+    cursor = Column(BigInteger, nullable=True)  # Последний обработанный tg_id
+    success_count = Column(Integer, default=0)
+    fail_count = Column(Integer, default=0)
+    locked_until = Column(DateTime, nullable=True)  # Аренда задания воркером
+    locked_by = Column(String, nullable=True)  # Какой воркер держит аренду
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class BroadcastDelivery(Base):
+    """Факт доставки рассылки конкретному пользователю"""
+    __tablename__ = 'broadcast_deliveries'
+    __table_args__ = (UniqueConstraint('job_id', 'user_id', name='uq_broadcast_delivery'),)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String, nullable=False, index=True)
+    user_id = Column(BigInteger, nullable=False)
+    status = Column(String, nullable=False)  # 'sent', 'failed' или 'blocked'
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class FSMState(Base):
+    """Состояния FSM aiogram в БД, чтобы их видели все экземпляры бота"""
+    __tablename__ = 'fsm_state'
+    key = Column(String, primary_key=True)  # Ключ из StorageKey: бот, чат, пользователь
+    state = Column(String, nullable=True)
+    data = Column(JSON, nullable=False, default=dict)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class EphemeralState(Base):
+    """Короткоживущие значения (антиспам, ожидание ответа админа), общие для экземпляров бота"""
+    __tablename__ = 'ephemeral_state'
+    key = Column(String, primary_key=True)  # '<пространство>:<ключ>'
+    value = Column(JSON, nullable=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,68 @@
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class PoolStats:
+    """Счётчики пула соединений: сколько раз и как долго ждали свободное соединение"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float):
+        self.checkouts += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    @property
+    def wait_avg(self) -> float:
+        return self.wait_total / self.checkouts if self.checkouts else 0.0
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Очередь соединений, замеряющая время ожидания соединения из пула"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        # engine.dispose() пересоздаёт пул — счётчики переходят в новый
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.record_wait(time.perf_counter() - started)
+
+
+def pool_snapshot(pool) -> dict:
+    """Текущая загрузка пула и накопленные счётчики ожидания"""
+    stats = getattr(pool, "stats", None) or PoolStats()
+    snapshot = {
+        "checkouts": stats.checkouts,
+        "timeouts": stats.timeouts,
+        "wait_total_ms": stats.wait_total * 1000,
+        "wait_avg_ms": stats.wait_avg * 1000,
+        "wait_max_ms": stats.wait_max * 1000,
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        snapshot.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(0, pool.overflow()),
+            max_overflow=pool._max_overflow,
+        )
+    return snapshot
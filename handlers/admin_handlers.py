@@ -1,4 +1,79 @@
-# Пустой роутер для админских хэндлеров (можно расширить позже)
-from aiogram import Router
+# Служебные команды администраторов
+from aiogram.filters import Command
+from aiogram.types import Message
 
-router = Router()
+from config import settings
+from database.engine import engine, replica_engine
+from database.pool import pool_snapshot
+from routing.indexed import create_router
+from services.profiler import profiler
+
+router = create_router()
+
+ADMINS = settings.ADMINS
+
+
+# --- Команда /pool (загрузка пула соединений с БД) ---
+@router.message(Command("pool"))
+async def show_pool(msg: Message):
+    if msg.from_user.id not in ADMINS:
+        await msg.answer("⛔️ Доступ запрещён! Только для администраторов.")
+        return
+
+    pools = [("Основная БД", engine)]
+    if replica_engine is not engine:
+        pools.append(("Реплика", replica_engine))
+    text = "🔌 <b>Пул соединений с БД</b>"
+    for title, pool_engine in pools:
+        text += f"\n\n<b>{title}</b>\n" + format_pool_stats(pool_snapshot(pool_engine.pool))
+    await msg.answer(text, parse_mode="HTML")
+
+
+def format_pool_stats(stats: dict) -> str:
+    text = ""
+    if "size" in stats:
+        text += (
+            f"Занято: <b>{stats['checked_out']}</b> / {stats['size'] + stats['max_overflow']}\n"
+            f"Свободно в пуле: {stats['idle']}\n"
+            f"Сверх размера пула: {stats['overflow']}\n"
+        )
+    return text + (
+        f"Выдано соединений: {stats['checkouts']}\n"
+        f"Ожидание: среднее {stats['wait_avg_ms']:.1f} мс, максимум {stats['wait_max_ms']:.1f} мс\n"
+        f"Таймаутов: {stats['timeouts']}"
+    )
+
+
+# --- Команда /profile (профилирование обновлений без перезапуска) ---
+@router.message(Command("profile"))
+async def toggle_profile(msg: Message):
+    if msg.from_user.id not in ADMINS:
+        await msg.answer("⛔️ Доступ запрещён! Только для администраторов.")
+        return
+
+    # /profile on|off, /profile rate <процент>, /profile threshold <сек>
+    args = msg.text.split()[1:]
+    try:
+        if args and args[0] in ("on", "off"):
+            profiler.enabled = args[0] == "on"
+        elif len(args) == 2 and args[0] == "rate":
+            profiler.sample_rate = min(100.0, max(0.0, float(args[1])))
+        elif len(args) == 2 and args[0] == "threshold":
+            profiler.threshold = max(0.0, float(args[1]))
+        elif args:
+            raise ValueError(args[0])
+    except ValueError:
+        await msg.answer(
+            "❗️ Использование: /profile [on|off], /profile rate <процент>, /profile threshold <сек>"
+        )
+        return
+
+    status = "включено ✅" if profiler.enabled else "выключено ❌"
+    await msg.answer(
+        f"🔬 <b>Профилирование обновлений:</b> {status}\n\n"
+        f"Порог медленного обновления: {profiler.threshold:g} сек\n"
+        f"cProfile для случайных обновлений: {profiler.sample_rate:g}%\n"
+        f"Снято профилей: {profiler.captured}\n"
+        f"Файлов в <code>{profiler.directory}</code>: {profiler.file_count()} (хранится {profiler.keep})",
+        parse_mode="HTML"
+    )
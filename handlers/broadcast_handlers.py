@@ -1,31 +1,42 @@
 from sqlalchemy.future import select
 from sqlalchemy import func
-from database.engine import get_session
+from sqlalchemy.ext.asyncio import AsyncSession
 from database.models import User, BroadcastInteraction
-from aiogram import Router, F, Bot
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.filters import Command
 from config import settings
+from routing.filters import ButtonText, CallbackExact, CallbackPrefix
+from routing.indexed import create_router
+from services.broadcast_jobs import create_job, broadcast_worker
+from services.recipients import count_active_users
+from services.segments import build_segment, describe_segment, parse_date_range
+from services.cache import TTLSnapshot
+from services.read_receipts import read_receipts
+from services.logs import SampledLog
 import logging
-import asyncio
 from datetime import datetime, timedelta
 import uuid
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-router = Router()
+router = create_router()
 
 ADMINS = settings.ADMINS
 
+stats_snapshot = TTLSnapshot(settings.STATS_CACHE_TTL)
+# Нажатия «Прочитал(-а)» в журнале — сводкой по рассылкам
+read_log = SampledLog(logger, "Отметок о прочтении", settings.LOG_SAMPLE_INTERVAL)
+
 # --- FSM состояния для рассылки ---
 class Broadcast(StatesGroup):
     choosing_content_type = State()
     waiting_for_content = State()
     choosing_tracking = State()  # Новое состояние для выбора отслеживания
     choosing_broadcast_type = State()
+    choosing_segment = State()
+    waiting_for_segment_arg = State()  # ID рассылки или период регистрации для сегмента
     confirming = State()
 
 
@@ -62,6 +73,20 @@ def get_broadcast_type_kb():
         inline_keyboard=[
             [InlineKeyboardButton(text="🧪 Тестовая рассылка (админам)", callback_data="bcast_test")],
             [InlineKeyboardButton(text="📢 Рассылка всем пользователям", callback_data="bcast_all")],
+            [InlineKeyboardButton(text="🎯 Рассылка по сегменту", callback_data="bcast_segment")],
+            [InlineKeyboardButton(text="❌ Отмена", callback_data="bcast_cancel")]
+        ]
+    )
+
+
+def get_segment_kb():
+    """Клавиатура выбора сегмента аудитории"""
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text="✍️ Задавали вопросы", callback_data="bseg_askers")],
+            [InlineKeyboardButton(text="✅ Прочитали рассылку", callback_data="bseg_readers")],
+            [InlineKeyboardButton(text="🙈 Не прочитали рассылку", callback_data="bseg_non_readers")],
+            [InlineKeyboardButton(text="📅 Зарегистрировались в период", callback_data="bseg_registered")],
             [InlineKeyboardButton(text="❌ Отмена", callback_data="bcast_cancel")]
         ]
     )
@@ -101,14 +126,14 @@ async def start_broadcast(msg: Message, state: FSMContext):
 
 
 # --- Отмена рассылки ---
-@router.callback_query(F.data == "bcast_cancel")
+@router.callback_query(CallbackExact("bcast_cancel"))
 async def cancel_broadcast(callback: CallbackQuery, state: FSMContext):
     await state.clear()
     await callback.message.edit_text("❌ Рассылка отменена.")
     await callback.answer()
 
 
-@router.message(F.text == "❌ Отмена")
+@router.message(ButtonText("❌ Отмена"))
 async def cancel_broadcast_text(msg: Message, state: FSMContext):
     current_state = await state.get_state()
     if current_state and current_state.startswith("Broadcast:"):
@@ -117,7 +142,7 @@ async def cancel_broadcast_text(msg: Message, state: FSMContext):
 
 
 # --- Выбор типа контента ---
-@router.callback_query(F.data.startswith("bcast_type_"), Broadcast.choosing_content_type)
+@router.callback_query(CallbackPrefix("bcast_type_"), Broadcast.choosing_content_type)
 async def choose_content_type(callback: CallbackQuery, state: FSMContext):
     content_type = callback.data.replace("bcast_type_", "")
     await state.update_data(content_type=content_type)
@@ -201,7 +226,7 @@ async def receive_content(msg: Message, state: FSMContext):
 
 
 # --- Выбор отслеживания ---
-@router.callback_query(F.data.in_(["bcast_tracking_yes", "bcast_tracking_no"]), Broadcast.choosing_tracking)
+@router.callback_query(CallbackExact("bcast_tracking_yes", "bcast_tracking_no"), Broadcast.choosing_tracking)
 async def choose_tracking(callback: CallbackQuery, state: FSMContext):
     add_tracking = callback.data == "bcast_tracking_yes"
     await state.update_data(add_tracking=add_tracking)
@@ -216,18 +241,16 @@ async def choose_tracking(callback: CallbackQuery, state: FSMContext):
 
 
 # --- Выбор типа рассылки (тест или все) ---
-@router.callback_query(F.data.in_(["bcast_test", "bcast_all"]), Broadcast.choosing_broadcast_type)
-async def choose_broadcast_type(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(CallbackExact("bcast_test", "bcast_all"), Broadcast.choosing_broadcast_type)
+async def choose_broadcast_type(callback: CallbackQuery, state: FSMContext, analytics_session: AsyncSession):
     broadcast_type = callback.data.replace("bcast_", "")
     await state.update_data(broadcast_type=broadcast_type)
     
-    # Получаем количество получателей
-    async for session in get_session():
-        if broadcast_type == "test":
-            count = len(ADMINS)
-        else:
-            result = await session.execute(select(User).where(User.is_active == True))
-            count = len(result.scalars().all())
+    # Получаем количество получателей (с реплики)
+    if broadcast_type == "test":
+        count = len(ADMINS)
+    else:
+        count = await count_active_users(analytics_session)
     
     broadcast_type_text = "🧪 Тестовая рассылка админам" if broadcast_type == "test" else "📢 Рассылка всем пользователям"
     
@@ -242,181 +265,145 @@ async def choose_broadcast_type(callback: CallbackQuery, state: FSMContext):
     await state.set_state(Broadcast.confirming)
 
 
+# --- Выбор сегмента аудитории ---
+@router.callback_query(CallbackExact("bcast_segment"), Broadcast.choosing_broadcast_type)
+async def choose_segment_menu(callback: CallbackQuery, state: FSMContext):
+    await callback.message.edit_text(
+        "🎯 <b>Выберите сегмент аудитории:</b>\n\n"
+        "Рассылка уйдёт только активным пользователям из сегмента.",
+        parse_mode="HTML",
+        reply_markup=get_segment_kb()
+    )
+    await callback.answer()
+    await state.set_state(Broadcast.choosing_segment)
+
+
+@router.callback_query(CallbackPrefix("bseg_"), Broadcast.choosing_segment)
+async def choose_segment(callback: CallbackQuery, state: FSMContext, analytics_session: AsyncSession):
+    kind = callback.data.replace("bseg_", "")
+    if kind == "askers":
+        await show_segment_confirm(callback.message, state, analytics_session, {"kind": kind})
+        await callback.answer()
+        return
+
+    await state.update_data(segment_kind=kind)
+    if kind == "registered":
+        prompt = "📅 Введите период регистрации в формате <code>01.09.2025-30.09.2025</code>:"
+    else:
+        prompt = "🆔 Введите ID рассылки (его присылает отчёт о рассылке с отслеживанием):"
+    await callback.message.edit_text(prompt, parse_mode="HTML")
+    await callback.answer()
+    await state.set_state(Broadcast.waiting_for_segment_arg)
+
+
+@router.message(Broadcast.waiting_for_segment_arg)
+async def receive_segment_arg(msg: Message, state: FSMContext, analytics_session: AsyncSession):
+    kind = (await state.get_data()).get("segment_kind")
+    text = (msg.text or "").strip()
+    if kind == "registered":
+        try:
+            since, until = parse_date_range(text)
+        except ValueError:
+            await msg.answer("❗️ Неверный период. Пример: <code>01.09.2025-30.09.2025</code>", parse_mode="HTML")
+            return
+        spec = {"kind": kind, "since": since, "until": until}
+    else:
+        if not text or " " in text:
+            await msg.answer("❗️ Введите ID рассылки одним словом, например: <code>abc12345</code>", parse_mode="HTML")
+            return
+        spec = {"kind": kind, "broadcast_id": text}
+    await show_segment_confirm(msg, state, analytics_session, spec)
+
+
+async def show_segment_confirm(message: Message, state: FSMContext, analytics_session: AsyncSession, spec: dict):
+    # Множество получателей сегмента строится по индексам и кэшируется, рассылка возьмёт его же
+    count = len(await build_segment(analytics_session, spec))
+    if not count:
+        await message.answer(
+            f"🤷 В сегменте «{describe_segment(spec)}» нет активных пользователей. Выберите другой:",
+            reply_markup=get_segment_kb()
+        )
+        await state.set_state(Broadcast.choosing_segment)
+        return
+
+    await state.update_data(broadcast_type="segment", segment=spec)
+    await message.answer(
+        f"<b>🎯 Рассылка по сегменту</b>\n"
+        f"{describe_segment(spec)}\n\n"
+        f"📊 Количество получателей: <b>{count}</b>\n\n"
+        f"⚠️ Подтвердите отправку рассылки:",
+        parse_mode="HTML",
+        reply_markup=get_confirm_kb()
+    )
+    await state.set_state(Broadcast.confirming)
+
+
 # --- Подтверждение и отправка рассылки ---
-@router.callback_query(F.data == "bcast_confirm", Broadcast.confirming)
-async def confirm_broadcast(callback: CallbackQuery, state: FSMContext, bot: Bot):
+@router.callback_query(CallbackExact("bcast_confirm"), Broadcast.confirming)
+async def confirm_broadcast(callback: CallbackQuery, state: FSMContext):
     data = await state.get_data()
-    content_type = data.get("content_type")
     broadcast_type = data.get("broadcast_type")
-    add_tracking = data.get("add_tracking", False)
     
     # Генерируем уникальный ID для этой рассылки
     broadcast_id = str(uuid.uuid4())[:8]  # Короткий ID
     
-    await callback.message.edit_text("⏳ Начинаю рассылку...")
-    await callback.answer()
-    
-    # Получаем список получателей
-    if broadcast_type == "test":
-        recipients = list(ADMINS)
-    else:
-        async for session in get_session():
-            result = await session.execute(select(User).where(User.is_active == True))
-            users = result.scalars().all()
-            recipients = [user.tg_id for user in users]
-    
-    # Создаём кнопку отслеживания если нужно
-    tracking_kb = None
-    if add_tracking:
-        tracking_kb = InlineKeyboardMarkup(
-            inline_keyboard=[
-                [InlineKeyboardButton(text="✅ Прочитал(-а)", callback_data=f"bcast_read_{broadcast_id}")]
-            ]
-        )
-    
-    # Отправка сообщений
-    success_count = 0
-    fail_count = 0
+    # Сохраняем задание в БД: рассылку выполнит фоновый воркер,
+    # он же продолжит её после перезапуска бота
+    await create_job(broadcast_id, callback.from_user.id, data)
+    broadcast_worker.submit()
     
-    for user_id in recipients:
-        try:
-            # Отправляем контент в зависимости от типа
-            if content_type == "text":
-                await bot.send_message(
-                    user_id, 
-                    data.get("text"),
-                    reply_markup=tracking_kb
-                )
-            
-            elif content_type == "photo" or content_type == "photo_text":
-                await bot.send_photo(
-                    user_id,
-                    photo=data.get("photo_id"),
-                    caption=data.get("caption"),
-                    reply_markup=tracking_kb
-                )
-            
-            elif content_type == "video":
-                await bot.send_video(
-                    user_id,
-                    video=data.get("video_id"),
-                    caption=data.get("caption"),
-                    reply_markup=tracking_kb
-                )
-            
-            elif content_type == "audio":
-                if data.get("audio_id"):
-                    await bot.send_audio(
-                        user_id,
-                        audio=data.get("audio_id"),
-                        caption=data.get("caption"),
-                        reply_markup=tracking_kb
-                    )
-                else:
-                    await bot.send_voice(
-                        user_id,
-                        voice=data.get("voice_id"),
-                        reply_markup=tracking_kb
-                    )
-            
-            elif content_type == "video_note":
-                # К видео-кружкам нельзя добавить inline кнопки напрямую
-                # Отправляем кружок, потом текст с кнопкой если нужно
-                await bot.send_video_note(
-                    user_id,
-                    video_note=data.get("video_note_id")
-                )
-                if add_tracking:
-                    await bot.send_message(
-                        user_id,
-                        "👆 Нажмите когда просмотрите:",
-                        reply_markup=tracking_kb
-                    )
-            
-            success_count += 1
-            # Небольшая задержка, чтобы не попасть под ограничения Telegram
-            await asyncio.sleep(0.05)
-        
-        except Exception as e:
-            fail_count += 1
-            logger.error(f"[ERROR] Не удалось отправить сообщение пользователю {user_id}: {e}")
-    
-    # Отчёт о рассылке
-    broadcast_type_text = "🧪 Тестовая рассылка" if broadcast_type == "test" else "📢 Рассылка"
-    report = (
-        f"✅ <b>Рассылка завершена!</b>\n\n"
-        f"📊 <b>Статистика:</b>\n"
-        f"✅ Успешно: {success_count}\n"
-        f"❌ Ошибок: {fail_count}\n"
-        f"📈 Всего: {success_count + fail_count}\n"
+    await callback.message.edit_text(
+        "⏳ Рассылка запущена. Отчёт придёт по завершении.\n\n"
+        f"🆔 ID рассылки: <code>{broadcast_id}</code>",
+        parse_mode="HTML"
     )
-    
-    # Добавляем ID рассылки если было отслеживание
-    if add_tracking:
-        report += (
-            f"\n🆔 <b>ID рассылки:</b> <code>{broadcast_id}</code>\n"
-            f"ℹ️ Для просмотра статистики используйте:\n"
-            f"<code>/bstats {broadcast_id}</code>"
-        )
-    
-    await bot.send_message(callback.from_user.id, report, parse_mode="HTML")
+    await callback.answer()
     await state.clear()
-    logger.info(f"[INFO] {broadcast_type_text} завершена. Успешно: {success_count}, Ошибок: {fail_count}")
+    logger.info("Рассылка %s (%s) поставлена в очередь", broadcast_id, broadcast_type)
 
 
 # --- Команда /stats (статистика бота) ---
 @router.message(Command("stats"))
-async def show_statistics(msg: Message):
+async def show_statistics(msg: Message, analytics_session: AsyncSession):
     if msg.from_user.id not in ADMINS:
         await msg.answer("⛔️ Доступ запрещён! Только для администраторов.")
         return
     
-    async for session in get_session():
-        # Общее количество пользователей
-        total_users_result = await session.execute(select(func.count(User.id)))
-        total_users = total_users_result.scalar()
-        
-        # Активные пользователи
-        active_users_result = await session.execute(
-            select(func.count(User.id)).where(User.is_active == True)
-        )
-        active_users = active_users_result.scalar()
-        
-        # Неактивные пользователи
-        inactive_users = total_users - active_users
-        
-        # Новые пользователи за последние 24 часа
-        yesterday = datetime.utcnow() - timedelta(days=1)
-        new_today_result = await session.execute(
-            select(func.count(User.id)).where(User.created_at >= yesterday)
-        )
-        new_today = new_today_result.scalar()
-        
-        # Новые пользователи за последние 7 дней
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        new_week_result = await session.execute(
-            select(func.count(User.id)).where(User.created_at >= week_ago)
-        )
-        new_week = new_week_result.scalar()
-        
-        # Новые пользователи за последние 30 дней
-        month_ago = datetime.utcnow() - timedelta(days=30)
-        new_month_result = await session.execute(
-            select(func.count(User.id)).where(User.created_at >= month_ago)
-        )
-        new_month = new_month_result.scalar()
-        
-        # Пользователи с username
-        with_username_result = await session.execute(
-            select(func.count(User.id)).where(User.username.isnot(None))
-        )
-        with_username = with_username_result.scalar()
-        
-        # Последние 5 пользователей
-        latest_users_result = await session.execute(
-            select(User).order_by(User.created_at.desc()).limit(5)
-        )
-        latest_users = latest_users_result.scalars().all()
+    # Снимок общий для всех админов на STATS_CACHE_TTL секунд
+    stats_text = await stats_snapshot.get(lambda: build_statistics_text(analytics_session))
+    await msg.answer(stats_text, parse_mode="HTML")
+    logger.info("Пользователь %s запросил статистику", msg.from_user.id)
+
+
+async def build_statistics_text(session: AsyncSession):
+    now = datetime.utcnow()
+    # Все счётчики одним проходом по users: COUNT(*) FILTER (WHERE ...)
+    counters = (await session.execute(
+        select(
+            func.count().label("total"),
+            func.count().filter(User.is_active == True).label("active"),
+            func.count().filter(User.created_at >= now - timedelta(days=1)).label("new_today"),
+            func.count().filter(User.created_at >= now - timedelta(days=7)).label("new_week"),
+            func.count().filter(User.created_at >= now - timedelta(days=30)).label("new_month"),
+            func.count().filter(User.username.isnot(None)).label("with_username"),
+        ).select_from(User)
+    )).one()
+    
+    # Последние 5 пользователей (по индексу на created_at)
+    latest_users_result = await session.execute(
+        select(User.username, User.first_name, User.created_at)
+        .order_by(User.created_at.desc())
+        .limit(5)
+    )
+    latest_users = latest_users_result.all()
+
+    total_users = counters.total
+    active_users = counters.active
+    inactive_users = total_users - active_users
+    new_today = counters.new_today
+    new_week = counters.new_week
+    new_month = counters.new_month
+    with_username = counters.with_username
     
     # Формируем отчёт
     stats_text = (
@@ -440,41 +427,24 @@ async def show_statistics(msg: Message):
             date = user.created_at.strftime("%d.%m.%Y %H:%M") if user.created_at else "—"
             stats_text += f"{i}. {name} ({username_display}) - {date}\n"
     
-    await msg.answer(stats_text, parse_mode="HTML")
-    logger.info(f"[INFO] Пользователь {msg.from_user.id} запросил статистику")
+    stats_text += f"\n<i>Данные на {now.strftime('%d.%m.%Y %H:%M:%S')} UTC</i>"
+    return stats_text
 
 
 # --- Обработка нажатия на кнопку "Прочитал(-а)" ---
-@router.callback_query(F.data.startswith("bcast_read_"))
+@router.callback_query(CallbackPrefix("bcast_read_"))
 async def track_read(callback: CallbackQuery):
     # Извлекаем ID рассылки из callback_data
     broadcast_id = callback.data.replace("bcast_read_", "")
     user_id = callback.from_user.id
     
-    # Сохраняем взаимодействие в БД
-    async for session in get_session():
-        # Проверяем, не нажимал ли уже пользователь
-        existing = await session.execute(
-            select(BroadcastInteraction).where(
-                BroadcastInteraction.user_id == user_id,
-                BroadcastInteraction.broadcast_id == broadcast_id,
-                BroadcastInteraction.action == "read"
-            )
-        )
-        if existing.scalar_one_or_none():
-            await callback.answer("✅ Вы уже отметили это сообщение как прочитанное!", show_alert=False)
-            return
-        
-        # Создаём новую запись
-        interaction = BroadcastInteraction(
-            user_id=user_id,
-            broadcast_id=broadcast_id,
-            action="read"
-        )
-        session.add(interaction)
-        await session.commit()
+    # Нажатие попадает в буфер, в БД его запишет фоновая пачка (дубли отсекает уникальный индекс)
+    if not read_receipts.add(user_id, broadcast_id):
+        await callback.answer("✅ Вы уже отметили это сообщение как прочитанное!", show_alert=False)
+        return
     
-    # Обновляем кнопку
+    # Сразу отвечаем на нажатие, затем обновляем кнопку
+    await callback.answer("✅ Спасибо! Отмечено как прочитанное.", show_alert=False)
     await callback.message.edit_reply_markup(
         reply_markup=InlineKeyboardMarkup(
             inline_keyboard=[
@@ -482,18 +452,17 @@ async def track_read(callback: CallbackQuery):
             ]
         )
     )
-    await callback.answer("✅ Спасибо! Отмечено как прочитанное.", show_alert=False)
-    logger.info(f"[INFO] Пользователь {user_id} отметил рассылку {broadcast_id} как прочитанную")
+    read_log.add(broadcast_id, user_id=user_id)
 
 
-@router.callback_query(F.data == "already_read")
+@router.callback_query(CallbackExact("already_read"))
 async def already_read(callback: CallbackQuery):
     await callback.answer("✅ Уже отмечено как прочитанное", show_alert=False)
 
 
 # --- Команда просмотра статистики рассылки ---
 @router.message(Command("bstats"))
-async def broadcast_stats(msg: Message):
+async def broadcast_stats(msg: Message, analytics_session: AsyncSession):
     if msg.from_user.id not in ADMINS:
         await msg.answer("⛔️ Доступ запрещён! Только для администраторов.")
         return
@@ -510,47 +479,50 @@ async def broadcast_stats(msg: Message):
     
     broadcast_id = args[1]
     
-    async for session in get_session():
-        # Получаем всех кто прочитал
-        result = await session.execute(
-            select(BroadcastInteraction).where(
+    # Количество прочитавших и активных пользователей одним запросом
+    counters = (await analytics_session.execute(
+        select(
+            select(func.count()).select_from(BroadcastInteraction).where(
                 BroadcastInteraction.broadcast_id == broadcast_id,
                 BroadcastInteraction.action == "read"
-            )
+            ).scalar_subquery().label("read_count"),
+            select(func.count()).select_from(User).where(
+                User.is_active == True
+            ).scalar_subquery().label("total_users"),
         )
-        interactions = result.scalars().all()
-        
-        if not interactions:
-            await msg.answer(
-                f"❌ Нет данных по рассылке с ID: <code>{broadcast_id}</code>\n\n"
-                "Возможно, рассылка была без кнопки отслеживания или никто ещё не нажал на кнопку.",
-                parse_mode="HTML"
-            )
-            return
-        
-        # Получаем информацию о пользователях
-        read_count = len(interactions)
-        user_ids = [i.user_id for i in interactions]
-        
-        # Получаем общее количество активных пользователей (потенциальных получателей)
-        total_users_result = await session.execute(
-            select(func.count(User.id)).where(User.is_active == True)
+    )).one()
+    read_count = counters.read_count
+    # Общее количество активных пользователей (потенциальных получателей)
+    total_users = counters.total_users
+    
+    if not read_count:
+        await msg.answer(
+            f"❌ Нет данных по рассылке с ID: <code>{broadcast_id}</code>\n\n"
+            "Возможно, рассылка была без кнопки отслеживания или никто ещё не нажал на кнопку.",
+            parse_mode="HTML"
         )
-        total_users = total_users_result.scalar()
-        
-        # Формируем список прочитавших
-        users_info = []
-        for interaction in interactions[:10]:  # Показываем первых 10
-            user_result = await session.execute(
-                select(User).where(User.tg_id == interaction.user_id)
-            )
-            user = user_result.scalar_one_or_none()
-            if user:
-                username = f"@{user.username}" if user.username else "без username"
-                name = user.first_name or "Без имени"
-                read_time = interaction.created_at.strftime("%d.%m %H:%M") if interaction.created_at else "—"
-                users_info.append(f"• {name} ({username}) - {read_time}")
+        return
     
+    # Последние 10 прочитавших: одно соединение с users, сортировка и лимит в БД
+    readers_result = await analytics_session.execute(
+        select(User.username, User.first_name, BroadcastInteraction.created_at)
+        .join(User, User.tg_id == BroadcastInteraction.user_id)
+        .where(
+            BroadcastInteraction.broadcast_id == broadcast_id,
+            BroadcastInteraction.action == "read"
+        )
+        .order_by(BroadcastInteraction.created_at.desc())
+        .limit(10)
+    )
+    
+    # Формируем список прочитавших
+    users_info = []
+    for reader in readers_result.all():
+        username = f"@{reader.username}" if reader.username else "без username"
+        name = reader.first_name or "Без имени"
+        read_time = reader.created_at.strftime("%d.%m %H:%M") if reader.created_at else "—"
+        users_info.append(f"• {name} ({username}) - {read_time}")
+
     percentage = round(read_count / total_users * 100, 1) if total_users > 0 else 0
     
     stats_text = (
@@ -566,5 +538,5 @@ async def broadcast_stats(msg: Message):
             stats_text += f"\n\n... и ещё {read_count - 10} пользователей"
     
     await msg.answer(stats_text, parse_mode="HTML")
-    logger.info(f"[INFO] Пользователь {msg.from_user.id} запросил статистику рассылки {broadcast_id}")
+    logger.info("Пользователь %s запросил статистику рассылки %s", msg.from_user.id, broadcast_id)
 
@@ -1,21 +1,26 @@
-from sqlalchemy.future import select
-from database.engine import get_session
-from database.models import Question, FAQ, User
-from aiogram import Router, F
+from database.models import Question, FAQ
+from aiogram import F
 from aiogram.types import Message, CallbackQuery, ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.filters import Command, CommandStart, StateFilter
 from aiogram.enums import ChatType
 from config import settings
+from routing.filters import ButtonText, CallbackExact, CallbackPrefix
+from routing.indexed import create_router
+from services.faq_cache import faq_cache, fetch_faq_page, FAQPage
+from services.faq_search import faq_search
+from services.users import register_user
+from services.ephemeral import EphemeralStore
 import logging
 import time
 from aiogram.exceptions import TelegramBadRequest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-router = Router()
+router = create_router()
 
 GROUP_CHAT_ID = settings.GROUP_CHAT_ID
 ADMINS = settings.ADMINS
@@ -29,10 +34,8 @@ class FAQAdmin(StatesGroup):
     action = State()  # Новое состояние для выбора действия (add, edit, delete)
     waiting_for_faq_question = State()
     waiting_for_faq_answer = State()
-    waiting_for_faq_edit_id = State()
     waiting_for_faq_edit_question = State()
     waiting_for_faq_edit_answer = State()
-    waiting_for_faq_delete_id = State()
 
 # --- Клавиатуры ---
 main_menu_reply_kb = ReplyKeyboardMarkup(
@@ -75,14 +78,40 @@ def get_faq_inline_kb():
         ]
     )
 
+def short_title(text: str, limit: int = 60) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+def get_page_nav_row(page: FAQPage, prefix: str):
+    # Листание по keyset-якорям: id первой и последней записи страницы
+    row = []
+    if page.has_prev:
+        row.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"{prefix}_prev_{page.items[0].id}"))
+    if page.has_next:
+        row.append(InlineKeyboardButton(text="Вперёд ➡️", callback_data=f"{prefix}_page_{page.items[-1].id}"))
+    return row
+
+# --- Клавиатура страницы FAQ: вопросы кнопками, ответ открывается по нажатию ---
+def get_faq_page_kb(page: FAQPage):
+    kb = [
+        [InlineKeyboardButton(text=short_title(faq.question), callback_data=f"faq_item_{faq.id}_{page.after_id}")]
+        for faq in page.items
+    ]
+    nav = get_page_nav_row(page, "faq")
+    if nav:
+        kb.append(nav)
+    return InlineKeyboardMarkup(inline_keyboard=kb)
+
 # --- Генерация админ-клавиатуры для FAQ ---
-def get_admin_faq_list_kb(faqs):
+def get_admin_faq_list_kb(page: FAQPage):
     kb = []
-    for faq in faqs:
+    for faq in page.items:
         kb.append([
-            InlineKeyboardButton(text="✏️ Изменить", callback_data=f"edit_faq_{faq.id}"),
-            InlineKeyboardButton(text="🗑️ Удалить", callback_data=f"delete_faq_{faq.id}")
+            InlineKeyboardButton(text=f"✏️ {short_title(faq.question)}", callback_data=f"edit_faq_{faq.id}"),
+            InlineKeyboardButton(text="🗑️", callback_data=f"delete_faq_{faq.id}")
         ])
+    nav = get_page_nav_row(page, "afaq")
+    if nav:
+        kb.append(nav)
     kb.append([InlineKeyboardButton(text="➕ Добавить FAQ", callback_data="admin_add_faq")])
     return InlineKeyboardMarkup(inline_keyboard=kb)
 
@@ -95,37 +124,15 @@ admin_menu_kb = InlineKeyboardMarkup(
     ]
 )
 
-# --- Глобальные переменные ---
-reply_waiting = {}
-last_question_time = {}
+# --- Временные состояния с TTL ---
+reply_waiting = EphemeralStore("reply_waiting", settings.REPLY_WAITING_TTL)  # id админа -> id вопроса
+last_question_time = EphemeralStore("last_question", settings.QUESTION_INTERVAL)  # id пользователя -> время вопроса
 
 # --- Хендлер /start ---
 @router.message(CommandStart())
 async def start_cmd(msg: Message, state: FSMContext):
-    # Сохраняем или обновляем пользователя в БД
-    async for session in get_session():
-        # Проверяем, существует ли пользователь
-        result = await session.execute(select(User).where(User.tg_id == msg.from_user.id))
-        user = result.scalar_one_or_none()
-        
-        if user:
-            # Обновляем данные существующего пользователя
-            user.username = msg.from_user.username
-            user.first_name = msg.from_user.first_name
-            user.last_name = msg.from_user.last_name
-            logger.info(f"[INFO] Обновлен пользователь: {msg.from_user.id} (@{msg.from_user.username})")
-        else:
-            # Создаем нового пользователя
-            user = User(
-                tg_id=msg.from_user.id,
-                username=msg.from_user.username,
-                first_name=msg.from_user.first_name,
-                last_name=msg.from_user.last_name
-            )
-            session.add(user)
-            logger.info(f"[INFO] Новый пользователь зарегистрирован: {msg.from_user.id} (@{msg.from_user.username})")
-        
-        await session.commit()
+    # Сохраняем или обновляем пользователя в БД (повторные /start без изменений в БД не ходят)
+    await register_user(msg.from_user)
     
     # Приветственный текст для пользователя
     welcome_text = (
@@ -145,7 +152,7 @@ async def start_cmd(msg: Message, state: FSMContext):
     await state.clear()
 
 # --- Хендлер "О нас" ---
-@router.message(F.text == "О нас ℹ️")
+@router.message(ButtonText("О нас ℹ️"))
 async def about_reply(msg: Message):
     # Текст с информацией о контактах и медиа
     about_text = (
@@ -161,70 +168,114 @@ async def about_reply(msg: Message):
     await msg.answer(about_text, parse_mode="HTML")
 
 
-@router.message(F.text == 'Редактировать FAQ')
-async def admin_faq_panel(msg: Message, state: FSMContext):
-    logger.info(f"[INFO] Пользователь {msg.from_user.id} открывает админ-панель FAQ через reply-кнопку: '{msg.text}'")
+@router.message(ButtonText("Редактировать FAQ"))
+async def admin_faq_panel(msg: Message, state: FSMContext, session: AsyncSession):
+    logger.info("Пользователь %s открывает админ-панель FAQ через reply-кнопку: '%s'", msg.from_user.id, msg.text)
     if msg.from_user.id not in ADMINS:
         await msg.answer("Доступно только администраторам!")
         return
-    faqs = await get_faqs()
-    if not faqs:
-        await msg.answer("FAQ пуст. Нечего редактировать.", reply_markup=get_admin_faq_list_kb([]))
-        await state.set_state(FAQAdmin.action)
-        return
-    text = "<b>FAQ для редактирования:</b>\n\n"
-    for i, faq in enumerate(faqs, 1):
-        text += f"<b>{i}. {faq.question}</b>\n<blockquote>{faq.answer}</blockquote>\n"
-    await msg.answer(text, parse_mode="HTML", reply_markup=get_admin_faq_list_kb(faqs))
+    await show_admin_faq_page(session, msg)
     await state.set_state(FAQAdmin.action)
 
-# --- Функция для получения списка FAQ из БД (общая для всех операций) ---
-async def get_faqs():
-    async for session in get_session():
-        return (await session.execute(select(FAQ))).scalars().all()
+# --- Страница админ-списка FAQ (читается из БД, чтобы админ видел актуальные данные) ---
+async def show_admin_faq_page(session: AsyncSession, chat: Message | CallbackQuery,
+                              after_id: int | None = None, before_id: int | None = None):
+    page = await fetch_faq_page(session, after_id, before_id, settings.FAQ_PAGE_SIZE)
+    if not page.items and (after_id or before_id):
+        # Записи страницы удалили — возвращаемся к началу
+        page = await fetch_faq_page(session, limit=settings.FAQ_PAGE_SIZE)
+    if page.items:
+        text = "<b>FAQ для редактирования:</b>\n\nНажмите на вопрос, чтобы изменить его, или 🗑️, чтобы удалить."
+    else:
+        text = "FAQ пуст. Нечего редактировать."
+    kb = get_admin_faq_list_kb(page)
+    if isinstance(chat, Message):
+        await chat.answer(text, parse_mode="HTML", reply_markup=kb)
+    else:
+        await chat.message.edit_text(text, parse_mode="HTML", reply_markup=kb)
 
-# --- Функция для показа FAQ ---
-async def show_faq_list(chat: Message | CallbackQuery):
-    faqs = await get_faqs()
-    if not faqs:
-        text = "FAQ пока пуст."
+@router.callback_query(CallbackPrefix("afaq_page_", "afaq_prev_"))
+async def admin_faq_page(callback: CallbackQuery, state: FSMContext, session: AsyncSession):
+    if callback.from_user.id not in ADMINS:
+        await callback.answer("Доступ запрещён!", show_alert=True)
+        return
+    _, direction, anchor = callback.data.split("_")
+    if direction == "prev":
+        await show_admin_faq_page(session, callback, before_id=int(anchor))
     else:
-        text = "<b>FAQ 📚</b>\n\n"
-        for i, faq in enumerate(faqs, 1):
-            text += f"<b>{i}. {faq.question}</b>\n<blockquote>{faq.answer}</blockquote>\n\n"
+        await show_admin_faq_page(session, callback, after_id=int(anchor))
+    await state.set_state(FAQAdmin.action)
+    await callback.answer()
 
+# --- Функция для показа FAQ ---
+async def show_faq_list(chat: Message | CallbackQuery, after_id: int | None = None, before_id: int | None = None):
+    # Страница строится из кэша: только заголовки вопросов, ответы открываются по кнопке
+    page = await faq_cache.get_page(after_id, before_id, settings.FAQ_PAGE_SIZE)
+    if not page.items and (after_id or before_id):
+        page = await faq_cache.get_page(limit=settings.FAQ_PAGE_SIZE)
+    if not page.items:
+        text, kb = "FAQ пока пуст.", None
+    else:
+        text, kb = "<b>FAQ 📚</b>\n\nВыберите вопрос:", get_faq_page_kb(page)
 
     if isinstance(chat, Message):
-        await chat.answer(text, parse_mode="HTML")
+        await chat.answer(text, parse_mode="HTML", reply_markup=kb)
     else:
         try:
-            await chat.message.edit_text(text, parse_mode="HTML")
+            await chat.message.edit_text(text, parse_mode="HTML", reply_markup=kb)
         except TelegramBadRequest as e:
             if "message is not modified" not in str(e):
                 raise
 
 # --- Хендлеры для просмотра FAQ ---
-@router.message(F.text == "FAQ 📚")
+@router.message(ButtonText("FAQ 📚"))
 async def faq_reply(msg: Message):
     await show_faq_list(msg)
 
-@router.callback_query(F.data == "show_faq")
+@router.callback_query(CallbackExact("show_faq"))
 async def faq_inline(callback: CallbackQuery):
     await show_faq_list(callback)
     await callback.answer()
 
+@router.callback_query(CallbackPrefix("faq_page_", "faq_prev_"))
+async def faq_page(callback: CallbackQuery):
+    _, direction, anchor = callback.data.split("_")
+    if direction == "prev":
+        await show_faq_list(callback, before_id=int(anchor))
+    else:
+        await show_faq_list(callback, after_id=int(anchor))
+    await callback.answer()
+
+@router.callback_query(CallbackPrefix("faq_item_"))
+async def faq_item(callback: CallbackQuery):
+    # faq_item_<id>_<якорь страницы, на которую вернуться>
+    _, _, faq_id, after_id = callback.data.split("_")
+    html = await faq_cache.get_html(int(faq_id))
+    if not html:
+        await callback.answer("Вопрос не найден, возможно, его удалили.", show_alert=True)
+        return
+    await callback.message.edit_text(
+        html,
+        parse_mode="HTML",
+        reply_markup=InlineKeyboardMarkup(
+            inline_keyboard=[[InlineKeyboardButton(text="🔙 К списку", callback_data=f"faq_page_{after_id}")]]
+        )
+    )
+    await callback.answer()
+
 # --- Запуск процесса задания вопроса ---
 async def start_question_flow(chat: Message | CallbackQuery, state: FSMContext, user_id: int):
     now = time.time()
-    last_time = last_question_time.get(user_id, 0)
-    if now - last_time < 60:
-        text = f"Можно задать вопрос раз в минуту! Подождите ещё {int(60 - (now - last_time))} сек."
+    # Запись живёт QUESTION_INTERVAL секунд: пока она есть, новый вопрос задать нельзя
+    if not await last_question_time.add(user_id, now):
+        last_time = await last_question_time.get(user_id) or now
+        wait = max(1, int(settings.QUESTION_INTERVAL - (now - last_time)))
+        text = f"Можно задать вопрос раз в минуту! Подождите ещё {wait} сек."
         if isinstance(chat, CallbackQuery):
             await chat.answer(text, show_alert=True)
         else:
             await chat.answer(text)
         return
-    last_question_time[user_id] = now
 
     text = "Напишите свой вопрос:"
     kb = cancel_reply_kb if isinstance(chat, Message) else None
@@ -239,11 +290,11 @@ async def start_question_flow(chat: Message | CallbackQuery, state: FSMContext,
     await state.set_state(AskQuestion.waiting_for_question)
 
 # --- Хендлеры для начала задания вопроса ---
-@router.message(F.text == "Задать вопрос ✍️")
+@router.message(ButtonText("Задать вопрос ✍️"))
 async def ask_question_reply(msg: Message, state: FSMContext):
     await start_question_flow(msg, state, msg.from_user.id)
 
-@router.callback_query(F.data == "ask_question")
+@router.callback_query(CallbackExact("ask_question"))
 async def ask_question_inline(callback: CallbackQuery, state: FSMContext):
     await start_question_flow(callback, state, callback.from_user.id)
     await callback.answer()
@@ -252,6 +303,20 @@ async def ask_question_inline(callback: CallbackQuery, state: FSMContext):
 @router.message(AskQuestion.waiting_for_question)
 async def get_question(msg: Message, state: FSMContext):
     await state.update_data(question=msg.text)
+
+    # Сначала предлагаем похожие вопросы из FAQ — возможно, ответ уже есть
+    matches = await faq_search.search(msg.text, limit=3) if msg.text else []
+    if matches:
+        kb = [
+            [InlineKeyboardButton(text=short_title(faq.question), callback_data=f"faq_item_{faq.id}_{faq.id - 1}")]
+            for faq in matches
+        ]
+        kb.append([InlineKeyboardButton(text="✅ Ответ нашёлся, не отправлять", callback_data="question_drop")])
+        await msg.answer(
+            "🔎 Возможно, ответ на твой вопрос уже есть в FAQ:",
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=kb)
+        )
+
     await msg.answer("Ты хочешь задать вопрос анонимно?",
                      reply_markup=ReplyKeyboardMarkup(
                          keyboard=[
@@ -261,42 +326,60 @@ async def get_question(msg: Message, state: FSMContext):
                      ))
     await state.set_state(AskQuestion.waiting_for_anon_choice)
 
+# --- Ответ нашёлся в FAQ, вопрос не отправляем ---
+@router.callback_query(CallbackExact("question_drop"), AskQuestion.waiting_for_anon_choice)
+async def drop_question(callback: CallbackQuery, state: FSMContext):
+    await state.clear()
+    kb = admin_menu_reply_kb if callback.from_user.id in ADMINS else main_menu_reply_kb
+    await callback.message.edit_reply_markup(reply_markup=None)
+    await callback.message.answer("Рады, что ответ нашёлся! Вопрос не отправлен.", reply_markup=kb)
+    await callback.answer()
+
+# Кнопка из старого сообщения: вопрос уже отправлен или состояние истекло
+@router.callback_query(CallbackExact("question_drop"))
+async def drop_question_expired(callback: CallbackQuery):
+    try:
+        await callback.message.edit_reply_markup(reply_markup=None)
+    except TelegramBadRequest as e:
+        logger.warning("Не удалось убрать кнопки у сообщения %s: %s", callback.message.message_id, e)
+    await callback.answer("Этот вопрос уже отправлен или отменён.")
+
 # --- Выбор анонимности и отправка вопроса ---
-@router.message(F.text.in_(["Анонимно 🤫", "Неанонимно 🙂"]), AskQuestion.waiting_for_anon_choice)
-async def anon_choice(msg: Message, state: FSMContext, bot):
+@router.message(ButtonText("Анонимно 🤫", "Неанонимно 🙂"), AskQuestion.waiting_for_anon_choice)
+async def anon_choice(msg: Message, state: FSMContext, bot, session: AsyncSession):
     data = await state.get_data()
     question = data.get("question")
     is_anon = msg.text == "Анонимно 🤫"
     username = msg.from_user.username or "Без ника"
     user_id = msg.from_user.id
 
-    async for session in get_session():
-        q = Question(user_id=user_id, username=username, question=question, is_anon=is_anon)
-        session.add(q)
-        await session.commit()
-        await session.refresh(q)
-        question_id = q.id
+    # Вопрос фиксируем до обращения к Bot API: ошибка отправки не должна его терять,
+    # а соединение не держится открытым на время сетевого запроса
+    q = Question(user_id=user_id, username=username, question=question, is_anon=is_anon)
+    session.add(q)
+    await session.commit()
+    question_id = q.id
 
     head = f"<b><i>@{username} задал вопрос:</i></b> 🤔" if is_anon else f"<b><i>{msg.from_user.full_name} (@{username}) задал вопрос:</i></b> 🤔"
     text = f'{head}\n\n<blockquote>{question}</blockquote>'
     sent = await bot.send_message(GROUP_CHAT_ID, text, reply_markup=get_reply_kb(question_id), parse_mode="HTML")
 
-    async for session in get_session():
-        q = await session.get(Question, question_id)
-        q.group_message_id = sent.message_id
-        await session.commit()
+    # Номер сообщения в группе — отдельным коротким UPDATE, его фиксирует middleware
+    await session.execute(
+        update(Question).where(Question.id == question_id).values(group_message_id=sent.message_id)
+    )
 
     await msg.answer("Вопрос отправлен в группу!", reply_markup=main_menu_reply_kb)
     await state.clear()
 
 # --- Ответ на вопрос (админ) ---
-@router.callback_query(F.data.startswith("reply_"))
+@router.callback_query(CallbackPrefix("reply_"))
 async def reply_btn(callback: CallbackQuery, bot):
     if callback.from_user.id not in ADMINS:
         await callback.answer("Только админ может отвечать на вопросы!", show_alert=True)
         return
     question_id = int(callback.data.split('_')[1])
-    reply_waiting[callback.from_user.id] = question_id
+    await reply_waiting.set(callback.from_user.id, question_id)
     await bot.send_message(
         callback.from_user.id,
         f"Введите ваш ответ на вопрос (ID: {question_id}) или нажмите Отмена.",
@@ -307,36 +390,35 @@ async def reply_btn(callback: CallbackQuery, bot):
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("cancel_reply_"))
+@router.callback_query(CallbackPrefix("cancel_reply_"))
 async def cancel_reply(callback: CallbackQuery):
-    reply_waiting.pop(callback.from_user.id, None)
+    await reply_waiting.pop(callback.from_user.id)
     await callback.message.edit_text("Отмена ответа.")
     await callback.answer()
 
 
-@router.message(StateFilter(None))
-async def get_reply_text(msg: Message, state: FSMContext, bot):
-    if msg.chat.type != ChatType.PRIVATE or msg.from_user.id not in ADMINS:
-        return
-    question_id = reply_waiting.get(msg.from_user.id)
+# Фильтр по админу отсекает сообщения остальных пользователей ещё на этапе маршрутизации
+@router.message(F.from_user.id.in_(ADMINS), F.chat.type == ChatType.PRIVATE, StateFilter(None))
+async def get_reply_text(msg: Message, state: FSMContext, bot, session: AsyncSession):
+    question_id = await reply_waiting.get(msg.from_user.id)
     if not question_id:
         return
 
     answer_text = msg.text
     answer_username = msg.from_user.username or "Без ника"
 
-    async for session in get_session():
-        q = await session.get(Question, question_id)
-        if not q:
-            await msg.answer("Вопрос не найден.")
-            reply_waiting.pop(msg.from_user.id, None)
-            return
-        q.answer = answer_text
-        q.answer_user_id = msg.from_user.id
-        q.answer_username = answer_username
-        await session.commit()
-        group_message_id = q.group_message_id
-        user_id = q.user_id
+    q = await session.get(Question, question_id)
+    if not q:
+        await msg.answer("Вопрос не найден.")
+        await reply_waiting.pop(msg.from_user.id)
+        return
+    q.answer = answer_text
+    q.answer_user_id = msg.from_user.id
+    q.answer_username = answer_username
+    # Ответ сохраняем до отправки: он не должен потеряться, если студент заблокировал бота
+    await session.commit()
+    group_message_id = q.group_message_id
+    user_id = q.user_id
 
     await bot.send_message(
         user_id,
@@ -353,19 +435,18 @@ async def get_reply_text(msg: Message, state: FSMContext, bot):
     )
 
     await msg.answer("Ответ отправлен и сообщение в группе обновлено!")
-    reply_waiting.pop(msg.from_user.id, None)
+    await reply_waiting.pop(msg.from_user.id)
     await state.clear()
 
 
 # --- Перезадание вопроса ---
-@router.callback_query(F.data.startswith("repeat_"))
-async def repeat_question(callback: CallbackQuery, bot):
+@router.callback_query(CallbackPrefix("repeat_"))
+async def repeat_question(callback: CallbackQuery, bot, session: AsyncSession):
     question_id = int(callback.data.split('_')[1])
-    async for session in get_session():
-        q = await session.get(Question, question_id)
-        if not q:
-            await callback.answer("Вопрос не найден", show_alert=True)
-            return
+    q = await session.get(Question, question_id)
+    if not q:
+        await callback.answer("Вопрос не найден", show_alert=True)
+        return
     text = f"<b>Перезадаём вопрос:</b>\n\n<blockquote>{q.question}</blockquote>"
     await bot.send_message(GROUP_CHAT_ID, text, reply_markup=get_reply_kb(question_id), parse_mode="HTML")
     await callback.answer("Вопрос перезадан!")
@@ -374,19 +455,20 @@ async def repeat_question(callback: CallbackQuery, bot):
 # --- Открытие админ-панели FAQ ---
 
 
-@router.callback_query(F.data == "admin_edit_faq")
-async def admin_edit_faq_callback(callback: CallbackQuery, state: FSMContext):
-    logger.info(f"[INFO] Пользователь {callback.from_user.id} открывает админ-панель FAQ через inline-кнопку")
+# Редактирование и удаление идут из постраничного списка: у каждого вопроса кнопки ✏️ и 🗑️
+@router.callback_query(CallbackExact("admin_edit_faq", "admin_delete_faq"))
+async def admin_edit_faq_callback(callback: CallbackQuery, state: FSMContext, session: AsyncSession):
+    logger.info("Пользователь %s открывает админ-панель FAQ через inline-кнопку", callback.from_user.id)
     if callback.from_user.id not in ADMINS:
         await callback.answer("Доступно только администраторам!", show_alert=True)
         return
-    await callback.message.edit_text("Выберите действие в админ-панели FAQ:", reply_markup=admin_menu_kb)
+    await show_admin_faq_page(session, callback)
     await state.set_state(FAQAdmin.action)
     await callback.answer()
 
 
 # --- Отмена админ-действий ---
-@router.callback_query(F.data == "admin_cancel")
+@router.callback_query(CallbackExact("admin_cancel"))
 async def admin_cancel(callback: CallbackQuery, state: FSMContext):
     await callback.message.edit_text("Действие отменено.")
     await state.clear()
@@ -394,9 +476,9 @@ async def admin_cancel(callback: CallbackQuery, state: FSMContext):
 
 
 # --- Добавление FAQ ---
-@router.callback_query(F.data == "admin_add_faq", FAQAdmin.action)
+@router.callback_query(CallbackExact("admin_add_faq"), FAQAdmin.action)
 async def admin_add_faq(callback: CallbackQuery, state: FSMContext):
-    logger.info(f"[INFO] Пользователь {callback.from_user.id} начинает добавление FAQ")
+    logger.info("Пользователь %s начинает добавление FAQ", callback.from_user.id)
     if callback.from_user.id not in ADMINS:
         await callback.answer("Доступ запрещён!", show_alert=True)
         return
@@ -413,22 +495,22 @@ async def admin_add_faq_question(msg: Message, state: FSMContext):
 
 
 @router.message(FAQAdmin.waiting_for_faq_answer)
-async def admin_add_faq_answer(msg: Message, state: FSMContext):
+async def admin_add_faq_answer(msg: Message, state: FSMContext, session: AsyncSession):
     data = await state.get_data()
     question = data.get("faq_question")
     answer = msg.text
-    async for session in get_session():
-        faq = FAQ(question=question, answer=answer)
-        session.add(faq)
-        await session.commit()
+    session.add(FAQ(question=question, answer=answer))
+    # Кэш перечитывает FAQ своей сессией, поэтому изменения фиксируем до обновления кэша
+    await session.commit()
+    await faq_cache.refresh()
     await msg.answer("FAQ успешно добавлен!", reply_markup=admin_menu_kb)
     await state.set_state(FAQAdmin.action)  # Возврат в панель
 
 
 # --- Редактирование FAQ ---
 # --- Индивидуальное редактирование FAQ по inline-кнопке ---
-@router.callback_query(F.data.startswith("edit_faq_"), FAQAdmin.action)
-async def edit_faq_callback(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(CallbackPrefix("edit_faq_"), FAQAdmin.action)
+async def edit_faq_callback(callback: CallbackQuery, state: FSMContext, session: AsyncSession):
     if callback.from_user.id not in ADMINS:
         await callback.answer("Доступ запрещён!", show_alert=True)
         return
@@ -437,11 +519,10 @@ async def edit_faq_callback(callback: CallbackQuery, state: FSMContext):
     except Exception:
         await callback.answer("Некорректный ID FAQ!", show_alert=True)
         return
-    async for session in get_session():
-        faq = await session.get(FAQ, faq_id)
-        if not faq:
-            await callback.answer("FAQ не найден!", show_alert=True)
-            return
+    faq = await session.get(FAQ, faq_id)
+    if not faq:
+        await callback.answer("FAQ не найден!", show_alert=True)
+        return
     await state.update_data(faq_edit_id=faq.id, current_question=faq.question, current_answer=faq.answer)
     await callback.message.edit_text(f"Введите новый вопрос (текущий: {faq.question}) или '-' для пропуска:")
     await state.set_state(FAQAdmin.waiting_for_faq_edit_question)
@@ -449,8 +530,8 @@ async def edit_faq_callback(callback: CallbackQuery, state: FSMContext):
 
 
 # --- Индивидуальное удаление FAQ по inline-кнопке ---
-@router.callback_query(F.data.startswith("delete_faq_"), FAQAdmin.action)
-async def delete_faq_callback(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(CallbackPrefix("delete_faq_"), FAQAdmin.action)
+async def delete_faq_callback(callback: CallbackQuery, state: FSMContext, session: AsyncSession):
     if callback.from_user.id not in ADMINS:
         await callback.answer("Доступ запрещён!", show_alert=True)
         return
@@ -459,55 +540,18 @@ async def delete_faq_callback(callback: CallbackQuery, state: FSMContext):
     except Exception:
         await callback.answer("Некорректный ID FAQ!", show_alert=True)
         return
-    async for session in get_session():
-        faq = await session.get(FAQ, faq_id)
-        if not faq:
-            await callback.answer("FAQ не найден!", show_alert=True)
-            return
-        await session.delete(faq)
-        await session.commit()
+    faq = await session.get(FAQ, faq_id)
+    if not faq:
+        await callback.answer("FAQ не найден!", show_alert=True)
+        return
+    await session.delete(faq)
+    await session.commit()
+    await faq_cache.refresh()
     await callback.message.edit_text("FAQ успешно удалён!", reply_markup=admin_menu_kb)
     await state.set_state(FAQAdmin.action)
     await callback.answer()
 
 
-@router.callback_query(F.data == "admin_edit_faq", FAQAdmin.action)
-async def admin_edit_faq(callback: CallbackQuery, state: FSMContext):
-    logger.info(f"[INFO] Пользователь {callback.from_user.id} начинает редактирование FAQ")
-    if callback.from_user.id not in ADMINS:
-        await callback.answer("Доступ запрещён!", show_alert=True)
-        return
-    faqs = await get_faqs()
-    if not faqs:
-        await callback.message.edit_text("FAQ пуст. Нечего редактировать.")
-        await callback.answer()
-        await state.set_state(FAQAdmin.action)
-        return
-    text = "<b>Выберите номер FAQ для редактирования:</b>\n"
-    for i, faq in enumerate(faqs, 1):
-        text += f"{i}. {faq.question}\n"
-    await callback.message.edit_text(text, parse_mode="HTML")
-    await state.set_state(FAQAdmin.waiting_for_faq_edit_id)
-    await callback.answer()
-
-
-@router.message(FAQAdmin.waiting_for_faq_edit_id)
-async def admin_edit_faq_id(msg: Message, state: FSMContext):
-    try:
-        faq_num = int(msg.text)
-    except ValueError:
-        await msg.answer("Введите корректный номер FAQ!")
-        return
-    faqs = await get_faqs()
-    if not (1 <= faq_num <= len(faqs)):
-        await msg.answer("Такого FAQ нет!")
-        return
-    faq = faqs[faq_num - 1]
-    await state.update_data(faq_edit_id=faq.id, current_question=faq.question, current_answer=faq.answer)
-    await msg.answer(f"Введите новый вопрос (текущий: {faq.question}) или '-' для пропуска:")
-    await state.set_state(FAQAdmin.waiting_for_faq_edit_question)
-
-
 @router.message(FAQAdmin.waiting_for_faq_edit_question)
 async def admin_edit_faq_question(msg: Message, state: FSMContext):
     new_question = msg.text if msg.text != "-" else (await state.get_data()).get("current_question")
@@ -517,56 +561,15 @@ async def admin_edit_faq_question(msg: Message, state: FSMContext):
 
 
 @router.message(FAQAdmin.waiting_for_faq_edit_answer)
-async def admin_edit_faq_answer(msg: Message, state: FSMContext):
+async def admin_edit_faq_answer(msg: Message, state: FSMContext, session: AsyncSession):
     data = await state.get_data()
     faq_id = data.get("faq_edit_id")
     new_question = data.get("faq_edit_question")
     new_answer = msg.text if msg.text != "-" else data.get("current_answer")
-    async for session in get_session():
-        faq = await session.get(FAQ, faq_id)
-        faq.question = new_question
-        faq.answer = new_answer
-        await session.commit()
+    faq = await session.get(FAQ, faq_id)
+    faq.question = new_question
+    faq.answer = new_answer
+    await session.commit()
+    await faq_cache.refresh()
     await msg.answer("FAQ успешно обновлён!", reply_markup=admin_menu_kb)
     await state.set_state(FAQAdmin.action)  # Возврат в панель
-
-
-# --- Удаление FAQ ---
-@router.callback_query(F.data == "admin_delete_faq", FAQAdmin.action)
-async def admin_delete_faq(callback: CallbackQuery, state: FSMContext):
-    logger.info(f"[INFO] Пользователь {callback.from_user.id} начинает удаление FAQ")
-    if callback.from_user.id not in ADMINS:
-        await callback.answer("Доступ запрещён!", show_alert=True)
-        return
-    faqs = await get_faqs()
-    if not faqs:
-        await callback.message.edit_text("FAQ пуст. Нечего удалять.")
-        await callback.answer()
-        await state.set_state(FAQAdmin.action)
-        return
-    text = "<b>Выберите номер FAQ для удаления:</b>\n"
-    for i, faq in enumerate(faqs, 1):
-        text += f"{i}. {faq.question}\n"
-    await callback.message.edit_text(text, parse_mode="HTML")
-    await state.set_state(FAQAdmin.waiting_for_faq_delete_id)
-    await callback.answer()
-
-
-@router.message(FAQAdmin.waiting_for_faq_delete_id)
-async def admin_delete_faq_id(msg: Message, state: FSMContext):
-    try:
-        faq_num = int(msg.text)
-    except ValueError:
-        await msg.answer("Введите корректный номер FAQ!")
-        return
-    faqs = await get_faqs()
-    if not (1 <= faq_num <= len(faqs)):
-        await msg.answer("Такого FAQ нет!")
-        return
-    faq = faqs[faq_num - 1]
-    async for session in get_session():
-        await session.delete(faq)
-        await session.commit()
-    await msg.answer("FAQ успешно удалён!", reply_markup=admin_menu_kb)
-    await state.set_state(FAQAdmin.action)  # Возврат в панель
-
@@ -1,23 +1,135 @@
 import asyncio
+from aiohttp import web
 from aiogram import Bot, Dispatcher
+from aiogram.client.telegram import PRODUCTION, TelegramAPIServer
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
 from aiogram.types import Message
 from aiogram.fsm.storage.memory import MemoryStorage
-from handlers import user_handlers, broadcast_handlers
+from database.fsm_storage import SQLAlchemyStorage
+from handlers import user_handlers, broadcast_handlers, admin_handlers
+from services.broadcast_jobs import broadcast_worker
+from services.read_receipts import read_receipts
+from services.ephemeral import sweeper
+from middlewares.throttling import throttling_middleware
+from middlewares.metrics import HandlerTimingMiddleware
+from middlewares.db_session import DBSessionMiddleware, track_checkouts
+from middlewares.profiling import ProfilingMiddleware
+from database.engine import engine, replica_engine, AsyncSessionLocal, AnalyticsSessionLocal
+from services.metrics import MetricsServer, MetricsSession, instrument_engine
+from services.logs import setup_logging, stop_logging
+from services.profiler import profiler
 from config import settings
 
-bot = Bot(token=settings.TOKEN)
-dp = Dispatcher(storage=MemoryStorage())
+
+def create_storage():
+    # В БД состояния переживают перезапуск и доступны всем экземплярам бота
+    if settings.FSM_STORAGE == "db":
+        return SQLAlchemyStorage(settings.FSM_STATE_TTL, settings.FSM_CACHE_TTL, settings.FSM_CLEANUP_INTERVAL)
+    return MemoryStorage()
+
+
+def create_session() -> MetricsSession:
+    api = TelegramAPIServer.from_base(settings.BOT_API_SERVER) if settings.BOT_API_SERVER else PRODUCTION
+    return MetricsSession(api=api)
+
+
+bot = Bot(token=settings.TOKEN, session=create_session())
+metrics_server = MetricsServer(settings.METRICS_HOST, settings.METRICS_PORT)
+dp = Dispatcher(storage=create_storage())
 
 
 def register_handlers():
+    # Антиспам до роутеров: лишние обновления не доходят до обработчиков и БД
+    dp.update.outer_middleware(throttling_middleware)
+    # Замер обработчиков; middleware диспетчера действуют и во вложенных роутерах
+    dp.message.middleware(HandlerTimingMiddleware())
+    dp.callback_query.middleware(HandlerTimingMiddleware())
+    # Профилирование медленных обновлений, включается PROFILE_ENABLED или командой /profile
+    dp.message.middleware(ProfilingMiddleware(profiler))
+    dp.callback_query.middleware(ProfilingMiddleware(profiler))
+    # Сессия БД на обновление: открывается только для обработчиков, которые её просят
+    db_session_middleware = DBSessionMiddleware(AsyncSessionLocal, AnalyticsSessionLocal)
+    dp.message.middleware(db_session_middleware)
+    dp.callback_query.middleware(db_session_middleware)
     dp.include_router(broadcast_handlers.router)  # Регистрируем первым, чтобы команды /rass и /stats работали
+    dp.include_router(admin_handlers.router)
     dp.include_router(user_handlers.router)
 
 
+async def on_startup(bot: Bot):
+    instrument_engine(engine, "primary")
+    track_checkouts(engine)
+    if replica_engine is not engine:
+        instrument_engine(replica_engine, "replica")
+        track_checkouts(replica_engine)
+    await metrics_server.start()
+    # Воркер рассылок сразу подхватывает незавершённые задания
+    await broadcast_worker.start(bot)
+    await read_receipts.start()
+    await sweeper.start()
+    if isinstance(dp.storage, SQLAlchemyStorage):
+        dp.storage.start_cleanup()
+    # Каждый экземпляр ставит один и тот же вебхук, повторный вызов ничего не меняет
+    if settings.BOT_MODE == "webhook" and settings.WEBHOOK_URL:
+        await bot.set_webhook(
+            settings.WEBHOOK_URL.rstrip("/") + settings.WEBHOOK_PATH,
+            secret_token=settings.WEBHOOK_SECRET,
+        )
+
+
+async def on_shutdown():
+    await broadcast_worker.stop()
+    # Дописываем в БД нажатия, накопленные с последнего сброса
+    await read_receipts.stop()
+    await sweeper.stop()
+    await dp.storage.close()
+    await metrics_server.stop()
+
+
+def create_app(handle_in_background: bool = True) -> web.Application:
+    """aiohttp-приложение, принимающее обновления от Telegram на WEBHOOK_PATH"""
+    # Без секрета любой POST на вебхук принимался бы как обновление, в том числе от имени админа.
+    # Случайный секрет при запуске не подходит: у экземпляров за балансировщиком он должен совпадать
+    if not settings.WEBHOOK_SECRET:
+        raise RuntimeError("Для BOT_MODE=webhook задайте WEBHOOK_SECRET: без него вебхук принимает чужие запросы")
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        handle_in_background=handle_in_background,
+        secret_token=settings.WEBHOOK_SECRET,
+    ).register(app, path=settings.WEBHOOK_PATH)
+    # Запуск и остановка диспетчера (on_startup/on_shutdown) вместе с приложением
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def run_webhook():
+    runner = web.AppRunner(create_app())
+    await runner.setup()
+    await web.TCPSite(runner, settings.WEBAPP_HOST, settings.WEBAPP_PORT).start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
 async def main():
+    # Журнал настраивается один раз на процесс: запись в stdout идёт из отдельного потока
+    setup_logging(settings.LOG_LEVEL, settings.LOG_FORMAT, settings.DB_ECHO)
     register_handlers()
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
     print("Работает")
-    await dp.start_polling(bot)
+    try:
+        if settings.BOT_MODE == "webhook":
+            await run_webhook()
+        else:
+            # getUpdates не работает, пока установлен вебхук
+            await bot.delete_webhook()
+            await dp.start_polling(bot)
+    finally:
+        stop_logging()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,71 @@
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from services.metrics import update_db_checkouts
+
+# Счётчик соединений, взятых из пула за время обработки текущего обновления
+update_checkouts: ContextVar[list | None] = ContextVar("update_checkouts", default=None)
+
+
+def track_checkouts(engine: AsyncEngine):
+    """Считает выдачи соединений из пула движка в счётчик текущего обновления"""
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        counter = update_checkouts.get()
+        if counter is not None:
+            counter[0] += 1
+
+
+class DBSessionMiddleware(BaseMiddleware):
+    """
+    Одна сессия БД на обновление, только для обработчиков с параметром session
+    (и analytics_session — для чтения с реплики).
+    Соединение берётся из пула при первом запросе, в конце обработки — один commit,
+    при исключении — rollback.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, analytics_factory: async_sessionmaker):
+        self.session_factory = session_factory
+        self.analytics_factory = analytics_factory
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        handler_object = data.get("handler")
+        params = handler_object.params if handler_object else ()
+        name = handler_object.callback.__name__ if handler_object else "unknown"
+        # AsyncSession не трогает пул до первого запроса, так что создать её дёшево
+        session: AsyncSession | None = self.session_factory() if "session" in params else None
+        analytics: AsyncSession | None = self.analytics_factory() if "analytics_session" in params else None
+        if session is not None:
+            data["session"] = session
+        if analytics is not None:
+            data["analytics_session"] = analytics
+
+        counter = [0]
+        token = update_checkouts.set(counter)
+        try:
+            result = await handler(event, data)
+            if session is not None:
+                await session.commit()
+            return result
+        except Exception:
+            if session is not None:
+                await session.rollback()
+            raise
+        finally:
+            update_checkouts.reset(token)
+            if session is not None:
+                await session.close()
+            if analytics is not None:
+                await analytics.close()
+            update_db_checkouts.observe(counter[0], handler=name)
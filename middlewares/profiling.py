@@ -0,0 +1,50 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from services.profiler import StackSampler, UpdateProfiler
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingMiddleware(BaseMiddleware):
+    """
+    Время обработки каждого обновления; медленные сохраняются стеками, случайная доля — cProfile.
+    Регистрируется как inner-middleware, чтобы знать обработчик и состояние FSM.
+    Пока профилирование выключено (/profile off), middleware ничего не делает.
+    """
+
+    def __init__(self, profiler: UpdateProfiler):
+        self.profiler = profiler
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        profiler = self.profiler
+        if not profiler.enabled:
+            return await handler(event, data)
+
+        handler_object = data.get("handler")
+        name = handler_object.callback.__name__ if handler_object else "unknown"
+        state = data.get("raw_state")
+        sampler = StackSampler(asyncio.current_task(), profiler.stack_interval, ProfilingMiddleware.__call__.__code__)
+        profile = profiler.start_cprofile() if profiler.should_sample() else None
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            elapsed = time.perf_counter() - started
+            sampler.stop()
+            if profile is not None:
+                profiler.stop_cprofile(profile)
+            slow = elapsed >= profiler.threshold
+            if slow:
+                logger.warning("Медленное обновление: %s [%s] %.0f мс", name, state, elapsed * 1000)
+            await profiler.save(name, state, elapsed, sampler.samples if slow else None, profile)
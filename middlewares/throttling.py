@@ -0,0 +1,130 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from config import settings
+from services.logs import SampledLog
+from services.metrics import updates_throttled
+from services.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+# Отброшенные обновления в журнале — сводкой по группам, а не строкой на каждое
+throttled_log = SampledLog(logger, "Отброшено слишком частых обновлений", settings.LOG_SAMPLE_INTERVAL)
+
+# Кнопки и callback_data, по которым обновление относится к группе
+FAQ_TEXTS = {"FAQ 📚"}
+FAQ_CALLBACK_PREFIXES = ("show_faq", "faq_")
+QUESTION_TEXTS = {"Задать вопрос ✍️", "Анонимно 🤫", "Неанонимно 🙂"}
+QUESTION_CALLBACK_PREFIXES = ("ask_question", "repeat_", "question_drop")
+
+
+def parse_limits(value: str) -> dict[str, tuple[float, float]]:
+    """'faq=2:10,questions=0.5:3' -> {'faq': (2.0, 10.0), ...}: токенов в секунду и размер ведра"""
+    limits = {}
+    for part in value.split(","):
+        if not part.strip():
+            continue
+        group, spec = part.split("=")
+        rate, capacity = spec.split(":")
+        limits[group.strip()] = (float(rate), float(capacity))
+    return limits
+
+
+def classify(update: Update) -> tuple[int | None, str]:
+    """Пользователь и группа обработчиков, к которой относится обновление"""
+    if update.message:
+        user_id = update.message.from_user.id if update.message.from_user else None
+        text = update.message.text or ""
+        if user_id in settings.ADMINS:
+            return user_id, "admin"
+        if text in FAQ_TEXTS:
+            return user_id, "faq"
+        if text in QUESTION_TEXTS:
+            return user_id, "questions"
+        return user_id, "messages"
+    if update.callback_query:
+        user = update.callback_query.from_user
+        data = update.callback_query.data or ""
+        if user.id in settings.ADMINS:
+            return user.id, "admin"
+        if data.startswith(FAQ_CALLBACK_PREFIXES):
+            return user.id, "faq"
+        if data.startswith(QUESTION_CALLBACK_PREFIXES):
+            return user.id, "questions"
+        return user.id, "callbacks"
+    return None, ""
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Ограничение частоты обновлений от одного пользователя: ведро токенов на пару
+    (пользователь, группа обработчиков). Лишние обновления отбрасываются ('drop')
+    или ждут токен не дольше max_delay секунд ('delay').
+    Таблица вёдер ограничена max_users записями, давно не писавшие вытесняются.
+    """
+
+    def __init__(self, limits: dict[str, tuple[float, float]], mode: str = "drop",
+                 max_delay: float = 2.0, max_users: int = 50000):
+        self.limits = limits
+        self.mode = mode
+        self.max_delay = max_delay
+        self.max_users = max_users
+        self._buckets: OrderedDict[tuple[int, str], TokenBucket] = OrderedDict()
+        self.dropped = 0
+
+    def _bucket(self, user_id: int, group: str) -> TokenBucket | None:
+        limit = self.limits.get(group)
+        if limit is None:
+            return None
+        key = (user_id, group)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(*limit)
+            while len(self._buckets) > self.max_users:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    async def _allow(self, bucket: TokenBucket) -> bool:
+        wait = bucket.try_acquire()
+        if not wait:
+            return True
+        if self.mode != "delay" or wait > self.max_delay:
+            return False
+        await asyncio.sleep(wait)
+        return bucket.try_acquire() == 0
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user_id, group = classify(event)
+        bucket = self._bucket(user_id, group) if user_id else None
+        if bucket is None or await self._allow(bucket):
+            return await handler(event, data)
+
+        self.dropped += 1
+        updates_throttled.inc(group=group)
+        throttled_log.add(group, user_id=user_id)
+        if event.callback_query:
+            # Убираем «часики» на кнопке, иначе клиент будет ждать ответа
+            try:
+                await event.callback_query.answer("Слишком часто, подождите немного")
+            except Exception:
+                pass
+        return None
+
+
+throttling_middleware = ThrottlingMiddleware(
+    parse_limits(settings.RATE_LIMITS),
+    mode=settings.RATE_LIMIT_MODE,
+    max_delay=settings.RATE_LIMIT_MAX_DELAY,
+    max_users=settings.RATE_LIMIT_MAX_USERS,
+)
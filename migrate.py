@@ -1,7 +1,51 @@
 from database.models import Base
 from database.engine import engine
+from services.faq_search import FAQ_TSVECTOR_SQL
+from sqlalchemy import inspect, text
 import asyncio
 
+# Индексы, добавленные в модели после создания таблиц: create_all не меняет существующие таблицы
+STATEMENTS = [
+    "CREATE INDEX IF NOT EXISTS ix_users_created_at ON users (created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_questions_user_id ON questions (user_id)",
+    "CREATE INDEX IF NOT EXISTS ix_broadcast_interactions_report "
+    "ON broadcast_interactions (broadcast_id, action, created_at)",
+]
+
+# Уникальный индекс на нажатия: перед созданием убираем дубли, оставляя самое раннее нажатие.
+# Полный проход по таблице нужен один раз — пока индекса нет, при следующих запусках он пропускается
+INTERACTION_DEDUPE = (
+    "DELETE FROM broadcast_interactions WHERE id NOT IN "
+    "(SELECT MIN(id) FROM broadcast_interactions GROUP BY user_id, broadcast_id, action)"
+)
+INTERACTION_UNIQUE = (
+    "CREATE UNIQUE INDEX uq_broadcast_interaction "
+    "ON broadcast_interactions (user_id, broadcast_id, action)"
+)
+
+# Колонки, добавленные в модели после создания таблиц: (таблица, колонка, определение)
+COLUMNS = [
+    ("broadcast_jobs", "locked_by", "VARCHAR"),
+]
+
+def _missing_columns(sync_conn) -> list[tuple[str, str, str]]:
+    inspector = inspect(sync_conn)
+    existing = {table: {column["name"] for column in inspector.get_columns(table)}
+                for table in {table for table, _, _ in COLUMNS}}
+    return [(table, column, ddl) for table, column, ddl in COLUMNS if column not in existing[table]]
+
+def _has_unique_interaction(sync_conn) -> bool:
+    inspector = inspect(sync_conn)
+    names = {index["name"] for index in inspector.get_indexes("broadcast_interactions")}
+    names |= {constraint["name"] for constraint in inspector.get_unique_constraints("broadcast_interactions")}
+    return "uq_broadcast_interaction" in names
+
+# Индексы, которые нельзя описать в моделях переносимо (только для PostgreSQL)
+POSTGRES_STATEMENTS = [
+    # Полнотекстовый поиск по FAQ
+    f"CREATE INDEX IF NOT EXISTS ix_faq_fts ON faq USING GIN ({FAQ_TSVECTOR_SQL})",
+]
+
 async def run_migrations():
     """
     Создаёт все таблицы из моделей в базе данных.
@@ -11,12 +55,26 @@ async def run_migrations():
     - users (новая)
     - questions
     - faq
-    - broadcast_interactions (новая)
+    - broadcast_interactions
+    - broadcast_jobs (новая)
+    - broadcast_deliveries (новая)
+    - fsm_state (новая)
+    - ephemeral_state (новая)
     """
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        for table, column, ddl in await conn.run_sync(_missing_columns):
+            await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        for statement in STATEMENTS:
+            await conn.execute(text(statement))
+        if not await conn.run_sync(_has_unique_interaction):
+            await conn.execute(text(INTERACTION_DEDUPE))
+            await conn.execute(text(INTERACTION_UNIQUE))
+        if engine.dialect.name == "postgresql":
+            for statement in POSTGRES_STATEMENTS:
+                await conn.execute(text(statement))
     print("✅ Миграции успешно применены!")
-    print("📋 Таблицы: users, questions, faq, broadcast_interactions")
+    print("📋 Таблицы: users, questions, faq, broadcast_interactions, broadcast_jobs, broadcast_deliveries, fsm_state, ephemeral_state")
 
 if __name__ == "__main__":
     asyncio.run(run_migrations())
@@ -0,0 +1,32 @@
+from aiogram.filters import Filter
+from aiogram.types import CallbackQuery, Message
+
+
+class ButtonText(Filter):
+    """Текст сообщения совпадает с одной из кнопок клавиатуры"""
+
+    def __init__(self, *texts: str):
+        self.texts = frozenset(texts)
+
+    async def __call__(self, message: Message) -> bool:
+        return message.text in self.texts
+
+
+class CallbackExact(Filter):
+    """callback_data совпадает с одним из значений"""
+
+    def __init__(self, *values: str):
+        self.values = frozenset(values)
+
+    async def __call__(self, callback: CallbackQuery) -> bool:
+        return callback.data in self.values
+
+
+class CallbackPrefix(Filter):
+    """callback_data начинается с одного из префиксов (например, 'reply_')"""
+
+    def __init__(self, *prefixes: str):
+        self.prefixes = tuple(prefixes)
+
+    async def __call__(self, callback: CallbackQuery) -> bool:
+        return callback.data is not None and callback.data.startswith(self.prefixes)
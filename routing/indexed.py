@@ -0,0 +1,153 @@
+from typing import Any
+
+from aiogram import Router
+from aiogram.dispatcher.event.bases import UNHANDLED, SkipHandler
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.dispatcher.event.telegram import TelegramEventObserver
+from aiogram.filters import Command, StateFilter
+from aiogram.fsm.state import State
+from aiogram.types import TelegramObject
+
+from config import settings
+from routing.filters import ButtonText, CallbackExact, CallbackPrefix
+
+# Префиксы индексируются по границам '_' в callback_data: 'bcast_read_ab12' -> 'bcast_', 'bcast_read_'
+PREFIX_SEPARATOR = "_"
+NO_KEYS = ()
+
+
+def _state_keys(filter_callback) -> tuple | None:
+    """Состояния FSM, в которых фильтр может пройти; None — любые (или не удалось определить)"""
+    if isinstance(filter_callback, State):
+        states = (filter_callback,)
+    elif isinstance(filter_callback, StateFilter):
+        states = filter_callback.states
+    else:
+        return None
+    keys = []
+    for state in states:
+        if isinstance(state, State) and state.state != "*":
+            keys.append(state.state)
+        elif state is None or (isinstance(state, str) and state != "*"):
+            keys.append(state)
+        else:
+            return None  # '*' или целая группа состояний
+    return tuple(keys)
+
+
+def _command_keys(filter_callback) -> tuple | None:
+    """'/start', '/stats'... для Command без регулярных выражений и без учёта регистра"""
+    if not isinstance(filter_callback, Command) or filter_callback.ignore_case:
+        return None
+    if not all(isinstance(command, str) for command in filter_callback.commands):
+        return None
+    return tuple(prefix + command for prefix in filter_callback.prefix for command in filter_callback.commands)
+
+
+class DispatchIndex:
+    """
+    Хэш-таблицы обработчиков по ключам их фильтров: текст кнопки, callback_data,
+    префикс callback_data, команда или состояние FSM. Обработчики без таких фильтров
+    проверяются всегда. Хранятся позиции обработчиков, поэтому порядок регистрации сохраняется.
+    """
+
+    def __init__(self, handlers: list[HandlerObject]):
+        self.size = len(handlers)
+        self.exact: dict[str, list[int]] = {}
+        self.prefix: dict[str, list[int]] = {}
+        self.commands: dict[str, list[int]] = {}
+        self.states: dict[str | None, list[int]] = {}
+        self.generic: list[int] = []
+        for position, handler in enumerate(handlers):
+            self._add(position, handler)
+
+    def _add(self, position: int, handler: HandlerObject):
+        filters = [filter_object.callback for filter_object in handler.filters or ()]
+        for filter_callback in filters:
+            if isinstance(filter_callback, ButtonText):
+                return self._put(self.exact, filter_callback.texts, position)
+            if isinstance(filter_callback, CallbackExact):
+                return self._put(self.exact, filter_callback.values, position)
+            if isinstance(filter_callback, CallbackPrefix) and all(
+                prefix.endswith(PREFIX_SEPARATOR) for prefix in filter_callback.prefixes
+            ):
+                return self._put(self.prefix, filter_callback.prefixes, position)
+        for filter_callback in filters:
+            keys = _command_keys(filter_callback)
+            if keys is not None:
+                return self._put(self.commands, keys, position)
+        for filter_callback in filters:
+            keys = _state_keys(filter_callback)
+            if keys is not None:
+                return self._put(self.states, keys, position)
+        self.generic.append(position)
+
+    @staticmethod
+    def _put(table: dict, keys, position: int):
+        for key in keys:
+            table.setdefault(key, []).append(position)
+
+    def candidates(self, key: str | None, command: str | None, raw_state: str | None) -> list[int]:
+        hits = list(self.generic)
+        hits.extend(self.states.get(raw_state, NO_KEYS))
+        if key is not None:
+            hits.extend(self.exact.get(key, NO_KEYS))
+            if self.prefix:
+                start = key.find(PREFIX_SEPARATOR)
+                while start != -1:
+                    hits.extend(self.prefix.get(key[:start + 1], NO_KEYS))
+                    start = key.find(PREFIX_SEPARATOR, start + 1)
+        if command is not None:
+            hits.extend(self.commands.get(command, NO_KEYS))
+        # Обычно подходит один обработчик: сортировка нужна, только если ключей несколько
+        return hits if len(hits) < 2 else sorted(set(hits))
+
+
+class IndexedObserver(TelegramEventObserver):
+    """Наблюдатель, проверяющий только обработчики, которые могут подойти к событию"""
+
+    def __init__(self, router: Router, event_name: str):
+        super().__init__(router=router, event_name=event_name)
+        self._index: DispatchIndex | None = None
+
+    def _lookup_keys(self, event: TelegramObject) -> tuple[str | None, str | None]:
+        if self.event_name == "callback_query":
+            return event.data, None
+        words = (event.text or event.caption or "").split(maxsplit=1)
+        command = words[0].split("@", 1)[0] if words else None
+        return event.text, command
+
+    async def trigger(self, event: TelegramObject, **kwargs: Any) -> Any:
+        if self._index is None or self._index.size != len(self.handlers):
+            self._index = DispatchIndex(self.handlers)
+        key, command = self._lookup_keys(event)
+        for position in self._index.candidates(key, command, kwargs.get("raw_state")):
+            handler = self.handlers[position]
+            kwargs["handler"] = handler
+            result, data = await handler.check(event, **kwargs)
+            if result:
+                kwargs.update(data)
+                try:
+                    wrapped_inner = self.outer_middleware.wrap_middlewares(
+                        self._resolve_middlewares(),
+                        handler.call,
+                    )
+                    return await wrapped_inner(event, kwargs)
+                except SkipHandler:
+                    continue
+        return UNHANDLED
+
+
+class IndexedRouter(Router):
+    """Роутер с индексом обработчиков сообщений и нажатий на кнопки"""
+
+    def __init__(self, *, name: str | None = None):
+        super().__init__(name=name)
+        for event_name in ("message", "callback_query"):
+            observer = IndexedObserver(router=self, event_name=event_name)
+            setattr(self, event_name, observer)
+            self.observers[event_name] = observer
+
+
+def create_router() -> Router:
+    return IndexedRouter() if settings.INDEXED_ROUTING else Router()
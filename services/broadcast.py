@@ -0,0 +1,190 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramRetryAfter, TelegramForbiddenError, TelegramBadRequest, TelegramNetworkError, TelegramServerError
+)
+from aiogram.types import InlineKeyboardMarkup
+from sqlalchemy import update
+
+from config import settings
+from database.engine import AsyncSessionLocal
+from database.models import User
+from services.logs import SampledLog
+from services.metrics import broadcast_queued, broadcast_messages
+from services.rate_limit import TokenBucket, ChatRateLimiter
+from services.users import profile_cache
+
+logger = logging.getLogger(__name__)
+# Ошибки доставки отдельным получателям — сводкой по классам ошибок с последним примером
+delivery_errors = SampledLog(logger, "Ошибок доставки рассылки", settings.LOG_SAMPLE_INTERVAL, logging.WARNING)
+
+# Общие для всех рассылок лимиты: глобальный на бота и отдельный на каждый чат
+global_bucket = TokenBucket(settings.BROADCAST_RATE)
+chat_limiter = ChatRateLimiter(settings.BROADCAST_CHAT_INTERVAL)
+
+MAX_RETRIES = 3
+
+# Ошибки Bad Request, означающие, что писать этому пользователю больше нельзя
+PERMANENT_ERROR_MARKERS = (
+    "chat not found",
+    "user not found",
+    "user is deactivated",
+    "bot was blocked",
+    "peer_id_invalid",
+)
+
+
+def is_permanent_error(error: Exception) -> bool:
+    """Пользователь заблокировал бота, удалил аккаунт или чат не существует"""
+    if isinstance(error, TelegramForbiddenError):
+        return True
+    if isinstance(error, TelegramBadRequest):
+        message = error.message.lower()
+        return any(marker in message for marker in PERMANENT_ERROR_MARKERS)
+    return False
+
+
+async def deactivate_users(user_ids: list[int]):
+    """Исключает пользователей из рассылок одним UPDATE"""
+    if not user_ids:
+        return
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(User).where(User.tg_id.in_(user_ids)).values(is_active=False))
+        await session.commit()
+    # Чтобы следующий /start снова включил пользователя, а не был пропущен кэшем профилей
+    profile_cache.discard(user_ids)
+    logger.info("Отключено от рассылок пользователей: %s", len(user_ids))
+
+
+@dataclass
+class BroadcastResult:
+    success_count: int = 0
+    fail_count: int = 0  # Все неудачные доставки, включая заблокировавших бота
+    blocked_count: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.success_count + self.fail_count
+
+
+async def _call(chat_id: int, method, *args, **kwargs):
+    """Один вызов Bot API с соблюдением лимитов и повтором после 429"""
+    for attempt in range(MAX_RETRIES + 1):
+        await chat_limiter.wait(chat_id)
+        await global_bucket.acquire()
+        try:
+            return await method(chat_id, *args, **kwargs)
+        except TelegramRetryAfter as e:
+            if attempt == MAX_RETRIES:
+                raise
+            logger.warning("Флуд-контроль Telegram, пауза %s сек.", e.retry_after)
+            global_bucket.pause(e.retry_after)
+        except (TelegramNetworkError, TelegramServerError):
+            # Временная ошибка сети или сервера Telegram: повторяем с нарастающей паузой
+            if attempt == MAX_RETRIES:
+                raise
+            await asyncio.sleep(2 ** attempt)
+
+
+async def send_content(bot: Bot, chat_id: int, data: dict, tracking_kb: InlineKeyboardMarkup | None = None):
+    """Отправляет контент рассылки (данные из FSM) одному получателю"""
+    content_type = data.get("content_type")
+
+    if content_type == "text":
+        await _call(chat_id, bot.send_message, data.get("text"), reply_markup=tracking_kb)
+
+    elif content_type == "photo" or content_type == "photo_text":
+        await _call(chat_id, bot.send_photo, photo=data.get("photo_id"), caption=data.get("caption"),
+                    reply_markup=tracking_kb)
+
+    elif content_type == "video":
+        await _call(chat_id, bot.send_video, video=data.get("video_id"), caption=data.get("caption"),
+                    reply_markup=tracking_kb)
+
+    elif content_type == "audio":
+        if data.get("audio_id"):
+            await _call(chat_id, bot.send_audio, audio=data.get("audio_id"), caption=data.get("caption"),
+                        reply_markup=tracking_kb)
+        else:
+            await _call(chat_id, bot.send_voice, voice=data.get("voice_id"), reply_markup=tracking_kb)
+
+    elif content_type == "video_note":
+        # К видео-кружкам нельзя добавить inline кнопки напрямую
+        # Отправляем кружок, потом текст с кнопкой если нужно
+        await _call(chat_id, bot.send_video_note, video_note=data.get("video_note_id"))
+        if tracking_kb:
+            await _call(chat_id, bot.send_message, "👆 Нажмите когда просмотрите:", reply_markup=tracking_kb)
+
+
+async def run_broadcast(bot: Bot, recipients: Iterable[int], data: dict,
+                        tracking_kb: InlineKeyboardMarkup | None = None,
+                        workers: int | None = None,
+                        on_result: Callable[[int, str], None] | None = None) -> BroadcastResult:
+    """
+    Рассылает контент списку получателей пулом параллельных воркеров.
+    Скорость ограничивается глобальным ведром токенов и лимитом на чат.
+    on_result(chat_id, status) вызывается после каждой попытки доставки,
+    status: 'sent', 'failed' или 'blocked'.
+    Заблокировавшие бота пользователи пачками отключаются от рассылок (is_active=False).
+    """
+    workers = workers or settings.BROADCAST_WORKERS
+    result = BroadcastResult()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    blocked: list[int] = []
+    queued = 0  # Получатели в очереди, отражаются в метрике broadcast_queued
+
+    async def flush_blocked():
+        batch = blocked[:]
+        blocked.clear()
+        try:
+            await deactivate_users(batch)
+        except Exception as e:
+            logger.error("Не удалось отключить заблокировавших бота пользователей: %s", e)
+
+    async def worker():
+        nonlocal queued
+        while True:
+            chat_id = await queue.get()
+            if chat_id is None:
+                return
+            queued -= 1
+            broadcast_queued.dec()
+            try:
+                await send_content(bot, chat_id, data, tracking_kb)
+                result.success_count += 1
+                status = "sent"
+            except Exception as e:
+                result.fail_count += 1
+                status = "failed"
+                if is_permanent_error(e):
+                    result.blocked_count += 1
+                    status = "blocked"
+                    blocked.append(chat_id)
+                    if len(blocked) >= settings.BROADCAST_DEACTIVATE_BATCH:
+                        await flush_blocked()
+                delivery_errors.add(type(e).__name__, chat_id=chat_id, error=str(e))
+            broadcast_messages.inc(status=status)
+            if on_result:
+                on_result(chat_id, status)
+
+    tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+    try:
+        for chat_id in recipients:
+            await queue.put(chat_id)
+            queued += 1
+            broadcast_queued.inc()
+        for _ in tasks:
+            await queue.put(None)
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Не разосланные из-за отмены получатели больше не в очереди
+        broadcast_queued.dec(queued)
+        if blocked:
+            await asyncio.shield(flush_blocked())
+    return result
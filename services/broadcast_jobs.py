@@ -0,0 +1,321 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+
+from aiogram import Bot
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from sqlalchemy import update, or_, func
+from sqlalchemy.future import select
+
+from config import settings
+from database.dialect import insert
+from database.engine import AsyncSessionLocal
+from database.models import BroadcastJob, BroadcastDelivery
+from services.broadcast import run_broadcast
+from services.recipients import iter_active_user_ids, iter_ids
+from services.segments import iter_segment_ids
+
+logger = logging.getLogger(__name__)
+
+
+def get_tracking_kb(broadcast_id: str):
+    """Кнопка «Прочитал(-а)» для рассылки с отслеживанием"""
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text="✅ Прочитал(-а)", callback_data=f"bcast_read_{broadcast_id}")]
+        ]
+    )
+
+
+async def create_job(broadcast_id: str, created_by: int, data: dict) -> BroadcastJob:
+    """Сохраняет задание рассылки; данные FSM записываются один раз"""
+    async with AsyncSessionLocal() as session:
+        job = BroadcastJob(
+            id=broadcast_id,
+            created_by=created_by,
+            broadcast_type=data.get("broadcast_type"),
+            payload=data,
+        )
+        session.add(job)
+        await session.commit()
+    return job
+
+
+class BroadcastWorker:
+    """
+    Фоновый исполнитель рассылок.
+    Берёт задания в аренду (locked_until, locked_by), чтобы их не выполняли два процесса сразу;
+    потеряв аренду, останавливает задание. Доставки сохраняются раз в BROADCAST_SAVE_INTERVAL
+    секунд, курсор — после каждой порции получателей. После перезапуска незавершённые задания
+    продолжаются с курсора без уже записанных получателей. Доставка «хотя бы один раз»:
+    кому сообщение ушло за последний интервал перед сбоем, тот может получить его повторно.
+    """
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.bot: Bot | None = None
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+
+    async def start(self, bot: Bot):
+        self.bot = bot
+        self._task = asyncio.create_task(self._loop())
+        logger.info("Воркер рассылок запущен")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def submit(self):
+        """Сообщает воркеру о новом задании"""
+        self._wakeup.set()
+
+    async def _loop(self):
+        while True:
+            try:
+                job_id = await self._claim_next()
+                if job_id:
+                    await self._run_job(job_id)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Ошибка воркера рассылок: %s", e)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.BROADCAST_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _claim_next(self) -> str | None:
+        """Находит незавершённое задание без действующей аренды и забирает его"""
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(BroadcastJob.id)
+                .where(
+                    BroadcastJob.status != "done",
+                    or_(BroadcastJob.locked_until.is_(None), BroadcastJob.locked_until < now)
+                )
+                .order_by(BroadcastJob.created_at)
+            )
+            for job_id in result.scalars().all():
+                claimed = await session.execute(
+                    update(BroadcastJob)
+                    .where(
+                        BroadcastJob.id == job_id,
+                        BroadcastJob.status != "done",
+                        or_(BroadcastJob.locked_until.is_(None), BroadcastJob.locked_until < now)
+                    )
+                    .values(status="running", locked_by=self.worker_id,
+                            locked_until=now + timedelta(seconds=settings.BROADCAST_LEASE))
+                )
+                await session.commit()
+                if claimed.rowcount == 1:
+                    return job_id
+        return None
+
+    async def _hold_lease(self, job_id: str):
+        """Продлевает аренду, пока она за этим воркером; возвращается, когда аренда потеряна"""
+        while True:
+            await asyncio.sleep(settings.BROADCAST_LEASE / 3)
+            try:
+                async with AsyncSessionLocal() as session:
+                    renewed = await session.execute(
+                        update(BroadcastJob)
+                        .where(
+                            BroadcastJob.id == job_id,
+                            BroadcastJob.locked_by == self.worker_id,
+                            BroadcastJob.status != "done"
+                        )
+                        .values(locked_until=datetime.utcnow() + timedelta(seconds=settings.BROADCAST_LEASE))
+                    )
+                    await session.commit()
+            except Exception as e:
+                # Повторим на следующем шаге: до истечения аренды есть ещё две попытки
+                logger.error("Не удалось продлить аренду рассылки %s: %s", job_id, e)
+                continue
+            if renewed.rowcount == 0:
+                return
+
+    def _recipient_pages(self, job: BroadcastJob):
+        """Порции получателей после курсора в порядке возрастания tg_id"""
+        cursor = job.cursor if job.cursor is not None else -1
+        size = settings.BROADCAST_CHECKPOINT_SIZE
+        if job.broadcast_type == "test":
+            return iter_ids(settings.ADMINS, cursor, size)
+        if job.payload.get("segment"):
+            return iter_segment_ids(job.payload["segment"], cursor, size)
+        return iter_active_user_ids(cursor, size)
+
+    async def _save_deliveries(self, job_id: str, outcomes: dict[int, str], cursor: int | None):
+        """Записывает доставки порции и продвигает курсор одной транзакцией"""
+        async with AsyncSessionLocal() as session:
+            if outcomes:
+                await session.execute(
+                    insert(BroadcastDelivery)
+                    .values([
+                        {"job_id": job_id, "user_id": user_id, "status": status, "created_at": datetime.utcnow()}
+                        for user_id, status in outcomes.items()
+                    ])
+                    .on_conflict_do_nothing(index_elements=["job_id", "user_id"])
+                )
+            sent = sum(1 for status in outcomes.values() if status == "sent")
+            values = {
+                "success_count": BroadcastJob.success_count + sent,
+                "fail_count": BroadcastJob.fail_count + len(outcomes) - sent,
+            }
+            if cursor is not None:
+                values["cursor"] = cursor
+            await session.execute(update(BroadcastJob).where(BroadcastJob.id == job_id).values(**values))
+            await session.commit()
+
+    async def _save_periodically(self, job_id: str, outcomes: dict[int, str], stop: asyncio.Event):
+        """Сохраняет накопленные доставки порции раз в BROADCAST_SAVE_INTERVAL секунд до stop"""
+        while True:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=settings.BROADCAST_SAVE_INTERVAL)
+                return
+            except asyncio.TimeoutError:
+                pass
+            batch = dict(outcomes)
+            outcomes.clear()
+            if not batch:
+                continue
+            try:
+                await self._save_deliveries(job_id, batch, None)
+            except Exception as e:
+                # Не потеряем: запишутся вместе с концом порции
+                batch.update(outcomes)
+                outcomes.clear()
+                outcomes.update(batch)
+                logger.error("Не удалось сохранить доставки рассылки %s: %s", job_id, e)
+
+    async def _process_chunk(self, job: BroadcastJob, chunk: list[int], tracking_kb):
+        # Пропускаем тех, кому уже доставлено до сбоя (доставки записаны, а курсор не сдвинут)
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(BroadcastDelivery.user_id).where(
+                    BroadcastDelivery.job_id == job.id,
+                    BroadcastDelivery.user_id.in_(chunk)
+                )
+            )
+            served = set(result.scalars().all())
+
+        outcomes: dict[int, str] = {}
+        stop = asyncio.Event()
+        saver = asyncio.create_task(self._save_periodically(job.id, outcomes, stop))
+
+        async def finish(cursor: int | None):
+            stop.set()
+            await saver
+            await self._save_deliveries(job.id, outcomes, cursor)
+
+        try:
+            await run_broadcast(
+                self.bot,
+                [user_id for user_id in chunk if user_id not in served],
+                job.payload,
+                tracking_kb,
+                on_result=lambda user_id, status: outcomes.__setitem__(user_id, status)
+            )
+        except BaseException:
+            # Остановка процесса, потеря аренды или ошибка: сохраняем уже сделанное, курсор не трогаем
+            await asyncio.shield(finish(None))
+            raise
+        await finish(chunk[-1])
+
+    async def _send_job(self, job: BroadcastJob):
+        tracking_kb = get_tracking_kb(job.id) if job.payload.get("add_tracking") else None
+        # Следующая порция читается из БД, пока отправляется текущая
+        pages = self._recipient_pages(job)
+        next_page = asyncio.ensure_future(anext(pages, None))
+        try:
+            while chunk := await next_page:
+                next_page = asyncio.ensure_future(anext(pages, None))
+                await self._process_chunk(job, chunk, tracking_kb)
+        finally:
+            next_page.cancel()
+
+    async def _run_job(self, job_id: str):
+        async with AsyncSessionLocal() as session:
+            job = await session.get(BroadcastJob, job_id)
+        if job.cursor is not None:
+            logger.info("Продолжаем рассылку %s с курсора %s", job_id, job.cursor)
+
+        lease = asyncio.create_task(self._hold_lease(job_id))
+        sending = asyncio.create_task(self._send_job(job))
+        try:
+            await asyncio.wait((lease, sending), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            lease.cancel()
+            if not sending.done():
+                # Аренду забрал другой экземпляр или воркер останавливается
+                sending.cancel()
+                try:
+                    await sending
+                except asyncio.CancelledError:
+                    pass
+        if sending.cancelled():
+            logger.warning("Аренда рассылки %s потеряна, задание продолжит другой экземпляр", job_id)
+            return
+        sending.result()
+
+        async with AsyncSessionLocal() as session:
+            finished = await session.execute(
+                update(BroadcastJob)
+                .where(BroadcastJob.id == job_id, BroadcastJob.locked_by == self.worker_id)
+                .values(status="done", finished_at=datetime.utcnow(), locked_until=None, locked_by=None)
+            )
+            await session.commit()
+            if finished.rowcount == 0:
+                logger.warning("Аренда рассылки %s потеряна перед завершением, отчёт отправит другой экземпляр",
+                               job_id)
+                return
+            job = await session.get(BroadcastJob, job_id)
+            blocked_count = (await session.execute(
+                select(func.count()).select_from(BroadcastDelivery).where(
+                    BroadcastDelivery.job_id == job_id,
+                    BroadcastDelivery.status == "blocked"
+                )
+            )).scalar()
+
+        await self._report(job, blocked_count)
+
+    async def _report(self, job: BroadcastJob, blocked_count: int):
+        broadcast_type_text = {"test": "🧪 Тестовая рассылка", "segment": "🎯 Рассылка по сегменту"}.get(
+            job.broadcast_type, "📢 Рассылка")
+        report = (
+            f"✅ <b>Рассылка завершена!</b>\n\n"
+            f"📊 <b>Статистика:</b>\n"
+            f"✅ Успешно: {job.success_count}\n"
+            f"❌ Ошибок: {job.fail_count}\n"
+            f"🚫 Из них заблокировали бота (отключены от рассылок): {blocked_count}\n"
+            f"📈 Всего: {job.success_count + job.fail_count}\n"
+        )
+
+        # Добавляем ID рассылки если было отслеживание
+        if job.payload.get("add_tracking"):
+            report += (
+                f"\n🆔 <b>ID рассылки:</b> <code>{job.id}</code>\n"
+                f"ℹ️ Для просмотра статистики используйте:\n"
+                f"<code>/bstats {job.id}</code>"
+            )
+
+        try:
+            await self.bot.send_message(job.created_by, report, parse_mode="HTML")
+        except Exception as e:
+            logger.error("Не удалось отправить отчёт о рассылке %s: %s", job.id, e)
+        logger.info("%s %s завершена. Успешно: %s, Ошибок: %s, Отключено: %s",
+                    broadcast_type_text, job.id, job.success_count, job.fail_count, blocked_count)
+
+
+broadcast_worker = BroadcastWorker()
@@ -0,0 +1,35 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+
+class TTLSnapshot:
+    """
+    Результат дорогого запроса, общий для всех вызовов в течение ttl секунд.
+    Одновременные запросы после истечения ttl ждут одно пересчитывание, а не делают своё.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._value: Any = None
+        self._loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    async def get(self, loader: Callable[[], Awaitable[Any]]) -> Any:
+        if self._is_fresh():
+            return self._value
+        async with self._lock:
+            if not self._is_fresh():
+                self._value = await loader()
+                self._loaded_at = time.monotonic()
+        return self._value
+
+    def expired(self) -> bool:
+        """Значение устарело и сейчас никто его не пересчитывает"""
+        return not self._is_fresh() and not self._lock.locked()
+
+    def invalidate(self):
+        self._loaded_at = None
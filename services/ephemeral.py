@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete
+from sqlalchemy.future import select
+
+from config import settings
+from database.dialect import insert
+from database.engine import AsyncSessionLocal
+from database.models import EphemeralState
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """
+    Значения с TTL в памяти процесса.
+    Не больше max_size ключей — при переполнении вытесняются давно записанные,
+    просроченные удаляются фоновой очисткой.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+
+    async def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def add(self, key: str, value: Any, ttl: float) -> bool:
+        if await self.get(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def pop(self, key: str):
+        self._entries.pop(key, None)
+
+    async def sweep(self) -> int:
+        now = time.monotonic()
+        expired = [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        return len(expired)
+
+
+class DatabaseBackend:
+    """Значения с TTL в таблице ephemeral_state — видны всем экземплярам бота и переживают перезапуск"""
+
+    async def get(self, key: str) -> Any:
+        async with AsyncSessionLocal() as session:
+            return (await session.execute(
+                select(EphemeralState.value)
+                .where(EphemeralState.key == key, EphemeralState.expires_at > datetime.utcnow())
+            )).scalar_one_or_none()
+
+    def _upsert(self, key: str, value: Any, ttl: float):
+        stmt = insert(EphemeralState).values(
+            key=key, value=value, expires_at=datetime.utcnow() + timedelta(seconds=ttl)
+        )
+        return stmt, {"value": stmt.excluded.value, "expires_at": stmt.excluded.expires_at}
+
+    async def set(self, key: str, value: Any, ttl: float):
+        stmt, set_ = self._upsert(key, value, ttl)
+        async with AsyncSessionLocal() as session:
+            await session.execute(stmt.on_conflict_do_update(index_elements=[EphemeralState.key], set_=set_))
+            await session.commit()
+
+    async def add(self, key: str, value: Any, ttl: float) -> bool:
+        # Одним запросом: вставка или перезапись только просроченной строки
+        stmt, set_ = self._upsert(key, value, ttl)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[EphemeralState.key], set_=set_,
+            where=EphemeralState.expires_at <= datetime.utcnow(),
+        )
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount > 0
+
+    async def pop(self, key: str):
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(EphemeralState).where(EphemeralState.key == key))
+            await session.commit()
+
+    async def sweep(self) -> int:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                delete(EphemeralState).where(EphemeralState.expires_at <= datetime.utcnow())
+            )
+            await session.commit()
+        return result.rowcount
+
+
+class EphemeralStore:
+    """Пространство ключей поверх общего бэкенда со своим TTL по умолчанию"""
+
+    def __init__(self, namespace: str, ttl: float):
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def _key(self, key) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key) -> Any:
+        return await backend.get(self._key(key))
+
+    async def set(self, key, value, ttl: float | None = None):
+        await backend.set(self._key(key), value, ttl or self.ttl)
+
+    async def add(self, key, value, ttl: float | None = None) -> bool:
+        """Записывает значение, только если ключа нет или он истёк. True — записано"""
+        return await backend.add(self._key(key), value, ttl or self.ttl)
+
+    async def pop(self, key):
+        await backend.pop(self._key(key))
+
+
+class Sweeper:
+    """Периодически удаляет просроченные значения из бэкенда"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                removed = await backend.sweep()
+                if removed:
+                    logger.info("Удалено просроченных временных значений: %s", removed)
+            except Exception as e:
+                logger.error("Не удалось очистить временные значения: %s", e)
+
+    async def start(self):
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+backend = DatabaseBackend() if settings.EPHEMERAL_BACKEND == "db" else MemoryBackend(settings.EPHEMERAL_MAX_SIZE)
+sweeper = Sweeper(settings.EPHEMERAL_SWEEP_INTERVAL)
@@ -0,0 +1,132 @@
+import asyncio
+import bisect
+import time
+from dataclasses import dataclass
+
+from sqlalchemy.future import select
+
+from config import settings
+from database.engine import AsyncSessionLocal
+from database.models import FAQ
+
+@dataclass(frozen=True)
+class FAQItem:
+    id: int
+    question: str
+    answer: str
+
+
+@dataclass(frozen=True)
+class FAQPage:
+    items: list[FAQItem]
+    has_prev: bool
+    has_next: bool
+
+    @property
+    def after_id(self) -> int:
+        """Якорь страницы: id, после которого она начинается"""
+        return self.items[0].id - 1 if self.items else 0
+
+
+async def fetch_faq_page(session, after_id: int | None = None, before_id: int | None = None,
+                         limit: int = 8) -> FAQPage:
+    """Страница FAQ из БД keyset-запросом по первичному ключу (без OFFSET)"""
+    query = select(FAQ.id, FAQ.question, FAQ.answer)
+    if before_id is not None:
+        query = query.where(FAQ.id < before_id).order_by(FAQ.id.desc())
+    else:
+        query = query.where(FAQ.id > (after_id or 0)).order_by(FAQ.id)
+    rows = (await session.execute(query.limit(limit + 1))).all()
+    more = len(rows) > limit
+    items = [FAQItem(*row) for row in rows[:limit]]
+    if before_id is not None:
+        items.reverse()
+    if not items:
+        return FAQPage(items, False, False)
+
+    # Есть ли записи с другой стороны страницы
+    if before_id is not None:
+        has_prev, has_next = more, True
+    else:
+        has_next = more
+        has_prev = (await session.execute(select(FAQ.id).where(FAQ.id < items[0].id).limit(1))).first() is not None
+    return FAQPage(items, has_prev, has_next)
+
+
+def render_faq_item(item: FAQItem) -> str:
+    """HTML одного вопроса с ответом"""
+    return f"<b>{item.question}</b>\n<blockquote>{item.answer}</blockquote>"
+
+
+class FAQCache:
+    """
+    Кэш FAQ в памяти процесса: записи и готовый HTML каждого ответа.
+    Пересобирается после изменений из админ-панели; TTL подстраховывает
+    на случай правок из другого процесса.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._items: list[FAQItem] | None = None
+        self._by_id: dict[int, FAQItem] = {}
+        self._ids: list[int] = []
+        self._html: dict[int, str] = {}
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self.version = 0  # Растёт при каждой перезагрузке, по нему пересобираются производные индексы
+
+    def _is_fresh(self) -> bool:
+        if self._items is None:
+            return False
+        return not self.ttl or time.monotonic() - self._loaded_at < self.ttl
+
+    async def refresh(self):
+        """Перечитывает FAQ из БД и пересобирает HTML ответов"""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(FAQ.id, FAQ.question, FAQ.answer).order_by(FAQ.id))
+            items = [FAQItem(*row) for row in result.all()]
+        self._items = items
+        self._by_id = {item.id: item for item in items}
+        self._ids = [item.id for item in items]
+        self._html = {item.id: render_faq_item(item) for item in items}
+        self._loaded_at = time.monotonic()
+        self.version += 1
+
+    async def _ensure(self):
+        if self._is_fresh():
+            return
+        async with self._lock:
+            # Пока ждали блокировку, кэш мог обновить другой запрос
+            if not self._is_fresh():
+                await self.refresh()
+
+    def invalidate(self):
+        self._items = None
+
+    async def get_items(self) -> list[FAQItem]:
+        await self._ensure()
+        return self._items
+
+    async def get(self, faq_id: int) -> FAQItem | None:
+        await self._ensure()
+        return self._by_id.get(faq_id)
+
+    async def get_html(self, faq_id: int) -> str | None:
+        await self._ensure()
+        return self._html.get(faq_id)
+
+    async def get_page(self, after_id: int | None = None, before_id: int | None = None,
+                       limit: int = 8) -> FAQPage:
+        """Страница FAQ из кэша: те же keyset-границы по id, что и fetch_faq_page"""
+        await self._ensure()
+        if before_id is not None:
+            end = bisect.bisect_left(self._ids, before_id)
+            start = max(0, end - limit)
+        else:
+            start = bisect.bisect_right(self._ids, after_id or 0)
+            end = start + limit
+        items = self._items[start:end]
+        return FAQPage(items, start > 0, end < len(self._items))
+
+
+faq_cache = FAQCache(settings.FAQ_CACHE_TTL)
@@ -0,0 +1,117 @@
+import logging
+import math
+import re
+import time
+from collections import Counter, defaultdict
+
+from sqlalchemy import text
+
+from config import settings
+from database.engine import engine, AsyncSessionLocal
+from services.faq_cache import faq_cache, FAQItem
+
+logger = logging.getLogger(__name__)
+
+# Выражение должно совпадать с GIN-индексом ix_faq_fts из migrate.py, иначе индекс не используется
+FAQ_TSVECTOR_SQL = "to_tsvector('russian', question || ' ' || answer)"
+
+SEARCH_SQL = text(f"""
+    SELECT id, ts_rank({FAQ_TSVECTOR_SQL}, query) AS rank
+    FROM faq, to_tsquery('russian', :query) AS query
+    WHERE {FAQ_TSVECTOR_SQL} @@ query
+    ORDER BY rank DESC
+    LIMIT :limit
+""")
+
+WORD_RE = re.compile(r"\w+")
+
+STOP_WORDS = {
+    "как", "что", "где", "когда", "почему", "зачем", "какой", "какая", "какие", "можно", "нужно",
+    "если", "или", "для", "это", "при", "про", "над", "под", "без", "ещё", "еще", "уже", "так",
+    "все", "всё", "мне", "меня", "мой", "моя", "мои", "вас", "вам", "нас", "нам", "они", "она",
+}
+
+
+def tokenize(value: str) -> list[str]:
+    """Слова запроса без стоп-слов, обрезанные до грубой основы (для русского словоизменения)"""
+    words = WORD_RE.findall(value.lower().replace("ё", "е"))
+    return [word[:6] for word in words if len(word) > 2 and word not in STOP_WORDS]
+
+
+class InvertedIndex:
+    """Инвертированный индекс по FAQ в памяти с ранжированием TF-IDF"""
+
+    def __init__(self, items: list[FAQItem]):
+        self._postings: dict[str, dict[int, int]] = defaultdict(dict)
+        for item in items:
+            # Совпадение в вопросе весит больше, чем в ответе
+            counts = Counter(tokenize(item.question) * 2 + tokenize(item.answer))
+            for term, count in counts.items():
+                self._postings[term][item.id] = count
+        self._size = max(1, len(items))
+
+    def search(self, query: str, limit: int) -> list[int]:
+        scores: dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + self._size / len(postings))
+            for faq_id, count in postings.items():
+                scores[faq_id] += (1 + math.log(count)) * idf
+        return sorted(scores, key=scores.get, reverse=True)[:limit]
+
+
+class FAQSearch:
+    """
+    Поиск похожих вопросов в FAQ.
+    На PostgreSQL — полнотекстовый поиск по tsvector с GIN-индексом,
+    иначе (SQLite в тестах) — инвертированный индекс поверх кэша FAQ.
+    """
+
+    def __init__(self, backend: str):
+        if backend == "auto":
+            backend = "postgres" if engine.dialect.name == "postgresql" else "memory"
+        self.backend = backend
+        self._index: InvertedIndex | None = None
+        self._index_version = -1
+        # Статистика задержки поиска, мс
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    async def _search_postgres(self, query: str, limit: int) -> list[int]:
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        # Префиксный поиск по основам слов, совпадение любого из них
+        ts_query = " | ".join(f"{term}:*" for term in terms)
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(SEARCH_SQL, {"query": ts_query, "limit": limit})
+            return [row.id for row in result]
+
+    async def _search_memory(self, query: str, limit: int) -> list[int]:
+        await faq_cache.get_items()
+        if self._index is None or self._index_version != faq_cache.version:
+            self._index = InvertedIndex(await faq_cache.get_items())
+            self._index_version = faq_cache.version
+        return self._index.search(query, limit)
+
+    async def search(self, query: str, limit: int = 3) -> list[FAQItem]:
+        started = time.perf_counter()
+        if self.backend == "postgres":
+            ids = await self._search_postgres(query, limit)
+        else:
+            ids = await self._search_memory(query, limit)
+        items = [item for item in [await faq_cache.get(faq_id) for faq_id in ids] if item]
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if elapsed_ms > settings.FAQ_SEARCH_WARN_MS:
+            logger.warning("Медленный поиск по FAQ (%s): %.1f мс", self.backend, elapsed_ms)
+        return items
+
+
+faq_search = FAQSearch(settings.FAQ_SEARCH_BACKEND)
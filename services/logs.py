@@ -0,0 +1,148 @@
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Поля LogRecord, которые не считаются пользовательскими (extra=...)
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """Одна запись — одна строка JSON; поля из extra= попадают в запись как есть"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            record.exc_text = record.exc_text or self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LoopQueueHandler(QueueHandler):
+    """
+    Кладёт запись в очередь без форматирования: в потоке событий только подстановка %s.
+    Стандартный QueueHandler форматирует запись целиком и теряет поля extra и трассировку.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Трассировка ссылается на кадры, которые к моменту записи уже изменятся
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: QueueListener | None = None
+_sampled_logs: list["SampledLog"] = []
+_flush_stop = threading.Event()
+_flush_thread: threading.Thread | None = None
+
+
+def _flush_loop(tick: float):
+    # Сводка выходит по таймеру, даже если после всплеска событий новых не было
+    while not _flush_stop.wait(tick):
+        for sampled in list(_sampled_logs):
+            sampled.flush_due()
+
+
+def setup_logging(level: str = "INFO", fmt: str = "json", sql_echo: bool = False):
+    """
+    Настраивает журнал процесса: обработчики корневого логгера только ставят записи в очередь,
+    запись в stdout идёт в отдельном потоке QueueListener. Ещё один поток раз в секунду
+    выпускает сводки SampledLog, у которых истёк интервал.
+    """
+    global _listener, _flush_thread
+    if _listener:
+        return
+    stream = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        stream.setFormatter(JSONFormatter())
+    else:
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(LoopQueueHandler(log_queue))
+    root.setLevel(level.upper())
+    # SQL-запросы журналируются через ту же очередь, а не синхронным обработчиком echo=True
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if sql_echo else logging.WARNING)
+
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+
+    _flush_stop.clear()
+    _flush_thread = threading.Thread(target=_flush_loop, args=(1.0,), name="sampled-log-flush", daemon=True)
+    _flush_thread.start()
+
+
+def stop_logging():
+    """Сбрасывает сводки частых событий, дописывает очередь и останавливает поток журнала"""
+    global _listener, _flush_thread
+    if _flush_thread:
+        _flush_stop.set()
+        _flush_thread.join()
+        _flush_thread = None
+    for sampled in _sampled_logs:
+        sampled.flush()
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+
+class SampledLog:
+    """
+    Агрегированный журнал частых событий (нажатия, ошибки доставки отдельным получателям).
+    События считаются по ключу, раз в interval секунд выходит одна сводная запись
+    с количеством по ключам и последним примером. add вызывается из цикла событий,
+    flush — ещё и из потока таймера, поэтому состояние меняется под блокировкой.
+    """
+
+    def __init__(self, logger: logging.Logger, message: str, interval: float, level: int = logging.INFO):
+        self.logger = logger
+        self.message = message
+        self.interval = interval
+        self.level = level
+        self._counts: Counter = Counter()
+        self._example: dict | None = None
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        _sampled_logs.append(self)
+
+    def add(self, key: str = "", **example):
+        with self._lock:
+            self._counts[key] += 1
+            self._example = example or self._example
+        self.flush_due()
+
+    def flush_due(self):
+        if time.monotonic() - self._started >= self.interval:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            counts, example, started = self._counts, self._example, self._started
+            self._counts = Counter()
+            self._example = None
+            self._started = time.monotonic()
+        if counts:
+            self.logger.log(self.level, "%s: %d за %.0f сек. %s", self.message, sum(counts.values()),
+                            time.monotonic() - started, dict(counts), extra={"example": example})
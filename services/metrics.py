@@ -0,0 +1,239 @@
+import logging
+import time
+from typing import Callable
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.methods import TelegramMethod
+from aiohttp import web
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from database.pool import pool_snapshot
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self._values: dict[tuple, float] = {} if labels else {(): 0}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def samples(self) -> list[str]:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}" for key, value in self._values.items()]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def set_total(self, value: float, **labels):
+        """Для сборщиков: счётчик уже накоплен в другом месте (например, в статистике пула)"""
+        self._values[self._key(labels)] = value
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}  # метки -> [счётчики по корзинам, сумма, количество]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][i] += 1
+        series[1] += value
+        series[2] += 1
+
+    def samples(self) -> list[str]:
+        lines = []
+        for key, (counts, total, count) in self._series.items():
+            for bound, bucket_count in zip((*map(str, self.buckets), "+Inf"), (*counts, count)):
+                labels = _format_labels(self.label_names, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Метрики процесса в текстовом формате Prometheus"""
+
+    def __init__(self):
+        self._metrics: list[Metric] = []
+        self._collectors: list[Callable[[], None]] = []
+
+    def _register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labels: tuple = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: tuple = ()) -> Gauge:
+        return self._register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def add_collector(self, collector: Callable[[], None]):
+        """Функция, обновляющая метрики прямо перед выдачей (например, загрузка пула)"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# --- Обработчики ---
+handler_duration = registry.histogram(
+    "bot_handler_duration_seconds", "Время работы обработчика", ("handler",))
+handler_errors = registry.counter(
+    "bot_handler_errors_total", "Исключения в обработчиках", ("handler", "error"))
+updates_throttled = registry.counter(
+    "bot_updates_throttled_total", "Обновления, отброшенные ограничением частоты", ("group",))
+update_db_checkouts = registry.histogram(
+    "bot_update_db_checkouts", "Соединения, взятые из пула за одно обновление", ("handler",),
+    buckets=(0, 1, 2, 3, 5, 10))
+
+# --- База данных ---
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds", "Время выполнения SQL-запроса", ("engine", "statement"))
+db_pool_checked_out = registry.gauge(
+    "db_pool_checked_out", "Выданные из пула соединения", ("engine",))
+db_pool_overflow = registry.gauge(
+    "db_pool_overflow", "Соединения сверх размера пула", ("engine",))
+db_pool_wait_seconds = registry.counter(
+    "db_pool_wait_seconds_total", "Суммарное ожидание свободного соединения", ("engine",))
+db_pool_timeouts = registry.counter(
+    "db_pool_timeouts_total", "Таймауты ожидания соединения", ("engine",))
+
+# --- Telegram Bot API ---
+telegram_duration = registry.histogram(
+    "telegram_api_duration_seconds", "Время запроса к Bot API", ("method",))
+telegram_errors = registry.counter(
+    "telegram_api_errors_total", "Ошибки запросов к Bot API по классам", ("method", "error"))
+
+# --- Рассылки (скорость отправки — rate(broadcast_messages_total[1m])) ---
+broadcast_queued = registry.gauge(
+    "broadcast_queued", "Получатели в очереди воркеров рассылки")
+broadcast_messages = registry.counter(
+    "broadcast_messages_total", "Результаты доставки рассылок", ("status",))
+
+
+def instrument_engine(engine: AsyncEngine, name: str):
+    """Замер SQL-запросов через события курсора и загрузка пула при каждой выдаче метрик"""
+
+    # Время начала хранится в контексте выполнения, а не в conn.info: после ошибки запроса
+    # after_cursor_execute не вызывается, и контекст просто уходит вместе с запросом
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context.metrics_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = context.metrics_started
+        verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        db_query_duration.observe(time.perf_counter() - started, engine=name, statement=verb)
+
+    def collect_pool():
+        stats = pool_snapshot(engine.pool)
+        db_pool_checked_out.set(stats.get("checked_out", 0), engine=name)
+        db_pool_overflow.set(stats.get("overflow", 0), engine=name)
+        db_pool_wait_seconds.set_total(stats["wait_total_ms"] / 1000, engine=name)
+        db_pool_timeouts.set_total(stats["timeouts"], engine=name)
+
+    registry.add_collector(collect_pool)
+
+
+class MetricsSession(AiohttpSession):
+    """HTTP-сессия бота, замеряющая каждый вызов Bot API"""
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout: int | None = None):
+        name = method.__api_method__
+        started = time.perf_counter()
+        try:
+            return await super().make_request(bot, method, timeout)
+        except Exception as e:
+            telegram_errors.inc(method=name, error=type(e).__name__)
+            raise
+        finally:
+            telegram_duration.observe(time.perf_counter() - started, method=name)
+
+
+class MetricsServer:
+    """Локальный HTTP-сервер с эндпоинтом /metrics"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._runner: web.AppRunner | None = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8")
+
+    async def start(self):
+        if not self.port:
+            return
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info("Метрики доступны на http://%s:%s/metrics", self.host, self.port)
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
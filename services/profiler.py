@@ -0,0 +1,149 @@
+import asyncio
+import cProfile
+import logging
+import os
+import random
+from collections import Counter
+from datetime import datetime
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _coroutine_stack(task: asyncio.Task, root_code=None) -> list[str]:
+    """
+    Цепочка await задачи от внешней корутины к самой глубокой.
+    Task.get_stack для приостановленной корутины отдаёт только верхний кадр, поэтому идём по cr_await.
+    Кадры выше root_code (диспетчер aiogram) отбрасываются.
+    """
+    frames = []
+    coro = task.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        if frame.f_code is root_code:
+            frames.clear()
+        else:
+            frames.append(_frame_name(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return frames
+
+
+class StackSampler:
+    """
+    Раз в interval секунд снимает стек await задачи обновления.
+    Снимок показывает, чего обновление ждёт: SQL, Bot API или другие корутины.
+    Пока поток событий занят вычислениями, таймер не срабатывает — такое время видно в cProfile.
+    """
+
+    def __init__(self, task: asyncio.Task, interval: float, root_code=None):
+        self.task = task
+        self.interval = interval
+        self.root_code = root_code
+        self.samples: Counter = Counter()
+        self._handle = asyncio.get_running_loop().call_later(interval, self._sample)
+
+    def _sample(self):
+        stack = _coroutine_stack(self.task, self.root_code)
+        if stack:
+            self.samples[";".join(stack)] += 1
+        self._handle = asyncio.get_running_loop().call_later(self.interval, self._sample)
+
+    def stop(self):
+        self._handle.cancel()
+
+
+class UpdateProfiler:
+    """
+    Профилирование обновлений: стеки медленных (дольше threshold секунд) и cProfile
+    для sample_rate процентов случайных обновлений. Результаты пишутся в directory,
+    хранятся последние keep файлов. Настройки меняются на ходу командой /profile.
+    """
+
+    def __init__(self, enabled: bool, threshold: float, sample_rate: float, stack_interval: float,
+                 directory: str, keep: int):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.stack_interval = stack_interval
+        self.directory = directory
+        self.keep = keep
+        self.captured = 0
+        self._cprofile_busy = False
+
+    def should_sample(self) -> bool:
+        # cProfile в потоке может быть только один, остальные обновления в это время не сэмплируются
+        return not self._cprofile_busy and self.sample_rate > 0 and random.random() * 100 < self.sample_rate
+
+    def start_cprofile(self) -> cProfile.Profile:
+        self._cprofile_busy = True
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def stop_cprofile(self, profile: cProfile.Profile):
+        profile.disable()
+        self._cprofile_busy = False
+
+    def _path(self, handler: str, state: str | None, elapsed: float, suffix: str) -> str:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        state = (state or "none").replace(":", "-")
+        return os.path.join(self.directory, f"{stamp}_{handler}_{state}_{elapsed * 1000:.0f}ms.{suffix}")
+
+    def _write_folded(self, path: str, root: str, samples: Counter):
+        # Формат collapsed stacks: открывается в speedscope или flamegraph.pl
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in samples.items():
+                f.write(f"{root};{stack} {count}\n")
+
+    def _rotate(self):
+        files = sorted(
+            (os.path.join(self.directory, name) for name in os.listdir(self.directory)),
+            key=os.path.getmtime,
+        )
+        # files[:-0] пуст: при keep=0 ротация не удаляла бы ничего, поэтому храним хотя бы последний файл
+        for path in files[:-max(self.keep, 1)]:
+            os.remove(path)
+
+    def _save(self, handler: str, state: str | None, elapsed: float,
+              samples: Counter | None, profile: cProfile.Profile | None):
+        os.makedirs(self.directory, exist_ok=True)
+        if samples:
+            self._write_folded(self._path(handler, state, elapsed, "folded"), f"{handler} [{state}]", samples)
+        if profile is not None:
+            profile.dump_stats(self._path(handler, state, elapsed, "prof"))
+        self._rotate()
+
+    async def save(self, handler: str, state: str | None, elapsed: float,
+                   samples: Counter | None = None, profile: cProfile.Profile | None = None):
+        """Запись файлов в отдельном потоке, чтобы не задерживать цикл событий"""
+        if not samples and profile is None:
+            return
+        self.captured += 1
+        try:
+            await asyncio.to_thread(self._save, handler, state, elapsed, samples, profile)
+        except OSError as e:
+            logger.error("Не удалось сохранить профиль обновления: %s", e)
+
+    def file_count(self) -> int:
+        try:
+            return len(os.listdir(self.directory))
+        except FileNotFoundError:
+            return 0
+
+
+profiler = UpdateProfiler(
+    settings.PROFILE_ENABLED,
+    settings.PROFILE_THRESHOLD,
+    settings.PROFILE_SAMPLE_RATE,
+    settings.PROFILE_STACK_INTERVAL,
+    settings.PROFILE_DIR,
+    settings.PROFILE_KEEP,
+)
@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Ведро токенов: не более rate операций в секунду с запасом capacity"""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """Пытается забрать токены. Возвращает 0 при успехе или сколько секунд ждать"""
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._refill(now)
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+    async def acquire(self, tokens: float = 1):
+        """Ждёт, пока в ведре появятся токены (ожидающие обслуживаются по очереди)"""
+        async with self._lock:
+            while True:
+                wait = self.try_acquire(tokens)
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Останавливает выдачу токенов, например после ответа 429 от Telegram"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+        # Пауза не копит токены: после неё ведро наполняется с нуля, а не отдаёт сразу capacity
+        self._updated = self._paused_until
+
+
+class ChatRateLimiter:
+    """Минимальный интервал между сообщениями в один и тот же чат"""
+
+    def __init__(self, interval: float, max_chats: int = 10000):
+        self.interval = interval
+        self.max_chats = max_chats
+        self._next_allowed: dict[int, float] = {}
+
+    def _purge(self, now: float):
+        expired = [chat_id for chat_id, ts in self._next_allowed.items() if ts <= now]
+        for chat_id in expired:
+            del self._next_allowed[chat_id]
+
+    async def wait(self, chat_id: int):
+        now = time.monotonic()
+        if len(self._next_allowed) >= self.max_chats:
+            self._purge(now)
+        allowed_at = self._next_allowed.get(chat_id, now)
+        self._next_allowed[chat_id] = max(allowed_at, now) + self.interval
+        if allowed_at > now:
+            await asyncio.sleep(allowed_at - now)
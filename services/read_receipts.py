@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from datetime import datetime
+
+from config import settings
+from database.dialect import insert
+from database.engine import AsyncSessionLocal
+from database.models import BroadcastInteraction
+
+logger = logging.getLogger(__name__)
+
+
+class ReadReceiptBuffer:
+    """
+    Буфер нажатий «Прочитал(-а)» с отложенной записью.
+    Нажатия копятся в памяти и раз в interval секунд пишутся пачками
+    INSERT ... ON CONFLICT DO NOTHING, поэтому повторные нажатия не дублируются.
+    """
+
+    def __init__(self, interval: float, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._pending: dict[tuple[int, str], datetime] = {}
+        self._task: asyncio.Task | None = None
+
+    def add(self, user_id: int, broadcast_id: str) -> bool:
+        """Ставит нажатие в очередь. False — такое нажатие уже ждёт записи"""
+        key = (user_id, broadcast_id)
+        if key in self._pending:
+            return False
+        self._pending[key] = datetime.utcnow()
+        return True
+
+    async def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        rows = [
+            {"user_id": user_id, "broadcast_id": broadcast_id, "action": "read", "created_at": created_at}
+            for (user_id, broadcast_id), created_at in pending.items()
+        ]
+        try:
+            async with AsyncSessionLocal() as session:
+                for i in range(0, len(rows), self.batch_size):
+                    await session.execute(
+                        insert(BroadcastInteraction)
+                        .values(rows[i:i + self.batch_size])
+                        .on_conflict_do_nothing(index_elements=["user_id", "broadcast_id", "action"])
+                    )
+                await session.commit()
+        except Exception as e:
+            # Возвращаем нажатия в буфер, запишем при следующей попытке
+            for key, created_at in pending.items():
+                self._pending.setdefault(key, created_at)
+            logger.error("Не удалось записать отметки о прочтении: %s", e)
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def start(self):
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+read_receipts = ReadReceiptBuffer(settings.READ_RECEIPTS_FLUSH_INTERVAL, settings.READ_RECEIPTS_BATCH)
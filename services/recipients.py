@@ -0,0 +1,42 @@
+from typing import AsyncIterator
+
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from database.engine import AsyncSessionLocal
+from database.models import User
+
+
+async def count_active_users(session) -> int:
+    """Количество получателей рассылки одним COUNT(*)"""
+    result = await session.execute(select(func.count()).select_from(User).where(User.is_active == True))
+    return result.scalar()
+
+
+async def iter_active_user_ids(after: int = -1, chunk_size: int = 500) -> AsyncIterator[list[int]]:
+    """
+    Отдаёт tg_id активных пользователей порциями по возрастанию (keyset-пагинация по tg_id).
+    Каждая порция читается отдельной короткой сессией, соединение между порциями не удерживается.
+    """
+    while True:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(User.tg_id)
+                .where(User.is_active == True, User.tg_id > after)
+                .order_by(User.tg_id)
+                .limit(chunk_size)
+            )
+            ids = list(result.scalars().all())
+        if not ids:
+            return
+        yield ids
+        if len(ids) < chunk_size:
+            return
+        after = ids[-1]
+
+
+async def iter_ids(ids, after: int = -1, chunk_size: int = 500) -> AsyncIterator[list[int]]:
+    """Те же порции для готового набора tg_id (например, списка админов)"""
+    ids = sorted(user_id for user_id in ids if user_id > after)
+    for i in range(0, len(ids), chunk_size):
+        yield ids[i:i + chunk_size]
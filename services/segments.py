@@ -0,0 +1,197 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from itertools import filterfalse
+from typing import AsyncIterator, Iterable
+
+from sqlalchemy.future import select
+
+from config import settings
+from database.engine import AsyncSessionLocal
+from database.models import User, Question, BroadcastInteraction, BroadcastDelivery
+from services.cache import TTLSnapshot
+
+
+class IdSet:
+    """
+    Множество tg_id в отсортированном array('q'): 8 байт на пользователя.
+    Пересечение и разность сохраняют порядок: если одно множество намного меньше другого —
+    бинарным поиском, иначе одним проходом filter с временным set (цикл на C, а не на Python).
+    """
+
+    __slots__ = ("ids",)
+
+    def __init__(self, ids: array):
+        self.ids = ids
+
+    @classmethod
+    def from_sorted(cls, values: Iterable[int]) -> "IdSet":
+        """Из уже отсортированных значений (ORDER BY в запросе), дубли отбрасываются"""
+        ids = array("q")
+        last = None
+        for value in values:
+            if value != last:
+                ids.append(value)
+                last = value
+        return cls(ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __contains__(self, value: int) -> bool:
+        i = bisect_left(self.ids, value)
+        return i < len(self.ids) and self.ids[i] == value
+
+    def intersect(self, other: "IdSet") -> "IdSet":
+        small, large = (self, other) if len(self) <= len(other) else (other, self)
+        if len(small) * 8 < len(large):
+            return IdSet(array("q", (value for value in small.ids if value in large)))
+        return IdSet(array("q", filter(set(small.ids).__contains__, large.ids)))
+
+    def subtract(self, other: "IdSet") -> "IdSet":
+        if len(other) * 8 < len(self):
+            # Вычитаемое маленькое: вырезаем найденные элементы срезами
+            result = array("q")
+            start = 0
+            for value in other.ids:
+                i = bisect_left(self.ids, value, start)
+                if i < len(self.ids) and self.ids[i] == value:
+                    result.extend(self.ids[start:i])
+                    start = i + 1
+            result.extend(self.ids[start:])
+            return IdSet(result)
+        return IdSet(array("q", filterfalse(set(other.ids).__contains__, self.ids)))
+
+    def pages(self, after: int = -1, size: int = 500):
+        """Порции tg_id после курсора — как у iter_active_user_ids"""
+        start = bisect_right(self.ids, after)
+        for i in range(start, len(self.ids), size):
+            yield list(self.ids[i:i + size])
+
+
+# --- Базовые множества: каждый запрос идёт по индексу и уже отсортирован ---
+async def _load_active(session) -> IdSet:
+    result = await session.execute(select(User.tg_id).where(User.is_active == True).order_by(User.tg_id))
+    return IdSet.from_sorted(result.scalars())
+
+
+async def _load_askers(session) -> IdSet:
+    result = await session.execute(select(Question.user_id).distinct().order_by(Question.user_id))
+    return IdSet.from_sorted(result.scalars())
+
+
+async def _load_readers(session, broadcast_id: str) -> IdSet:
+    result = await session.execute(
+        select(BroadcastInteraction.user_id)
+        .where(BroadcastInteraction.broadcast_id == broadcast_id, BroadcastInteraction.action == "read")
+        .order_by(BroadcastInteraction.user_id)
+    )
+    return IdSet.from_sorted(result.scalars())
+
+
+async def _load_delivered(session, broadcast_id: str) -> IdSet:
+    # Идентификатор задания рассылки совпадает с broadcast_id в кнопке «Прочитал(-а)»
+    result = await session.execute(
+        select(BroadcastDelivery.user_id)
+        .where(BroadcastDelivery.job_id == broadcast_id, BroadcastDelivery.status == "sent")
+        .order_by(BroadcastDelivery.user_id)
+    )
+    return IdSet.from_sorted(result.scalars())
+
+
+async def _load_registered(session, since: datetime, until: datetime) -> IdSet:
+    result = await session.execute(
+        select(User.tg_id).where(User.created_at >= since, User.created_at < until).order_by(User.tg_id)
+    )
+    return IdSet.from_sorted(result.scalars())
+
+
+class SegmentCache:
+    """
+    Готовые множества на SEGMENT_CACHE_TTL секунд: подсчёт в мастере и рассылка не повторяют запросы.
+    Ключей много (рассылки, периоды регистрации), поэтому устаревшие снимки удаляются при обращении.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._snapshots: dict[tuple, TTLSnapshot] = {}
+
+    def _evict(self):
+        for key in [key for key, snapshot in self._snapshots.items() if snapshot.expired()]:
+            del self._snapshots[key]
+
+    async def get(self, key: tuple, loader) -> IdSet:
+        self._evict()
+        snapshot = self._snapshots.get(key)
+        if snapshot is None:
+            snapshot = self._snapshots[key] = TTLSnapshot(self.ttl)
+        return await snapshot.get(loader)
+
+
+segment_cache = SegmentCache(settings.SEGMENT_CACHE_TTL)
+
+
+# --- Сегменты аудитории ---
+# Описание сегмента хранится в данных FSM и в задании рассылки, например:
+# {"kind": "askers"}, {"kind": "readers", "broadcast_id": "abc12345"},
+# {"kind": "non_readers", "broadcast_id": "abc12345"},
+# {"kind": "registered", "since": "2025-09-01", "until": "2025-10-01"} (until не включается)
+
+
+def parse_date_range(text: str) -> tuple[str, str]:
+    """'01.09.2025-30.09.2025' -> ('2025-09-01', '2025-10-01'); ValueError при ошибке"""
+    start_text, end_text = (part.strip() for part in text.split("-", 1))
+    start = datetime.strptime(start_text, "%d.%m.%Y")
+    end = datetime.strptime(end_text, "%d.%m.%Y") + timedelta(days=1)
+    if end <= start:
+        raise ValueError(text)
+    return start.date().isoformat(), end.date().isoformat()
+
+
+def describe_segment(spec: dict) -> str:
+    kind = spec["kind"]
+    if kind == "askers":
+        return "✍️ Задававшие вопросы"
+    if kind == "readers":
+        return f"✅ Прочитавшие рассылку {spec['broadcast_id']}"
+    if kind == "non_readers":
+        return f"🙈 Не прочитавшие рассылку {spec['broadcast_id']}"
+    since = datetime.fromisoformat(spec["since"]).strftime("%d.%m.%Y")
+    until = (datetime.fromisoformat(spec["until"]) - timedelta(days=1)).strftime("%d.%m.%Y")
+    return f"📅 Зарегистрировавшиеся с {since} по {until}"
+
+
+async def build_segment(session, spec: dict) -> IdSet:
+    """Активные пользователи сегмента: пересечение или разность с множеством активных"""
+    active = await segment_cache.get(("active",), lambda: _load_active(session))
+    kind = spec["kind"]
+    if kind == "askers":
+        return active.intersect(await segment_cache.get(("askers",), lambda: _load_askers(session)))
+    if kind in ("readers", "non_readers"):
+        broadcast_id = spec["broadcast_id"]
+        readers = await segment_cache.get(("readers", broadcast_id), lambda: _load_readers(session, broadcast_id))
+        if kind == "readers":
+            return active.intersect(readers)
+        # Не прочитали только те, кому рассылка доставлена, а не все, кто не нажимал кнопку
+        delivered = await segment_cache.get(
+            ("delivered", broadcast_id), lambda: _load_delivered(session, broadcast_id)
+        )
+        return active.intersect(delivered).subtract(readers)
+    if kind == "registered":
+        since, until = datetime.fromisoformat(spec["since"]), datetime.fromisoformat(spec["until"])
+        registered = await segment_cache.get(
+            ("registered", spec["since"], spec["until"]), lambda: _load_registered(session, since, until)
+        )
+        return active.intersect(registered)
+    raise ValueError(f"Неизвестный сегмент: {kind}")
+
+
+async def iter_segment_ids(spec: dict, after: int = -1, chunk_size: int = 500) -> AsyncIterator[list[int]]:
+    """Порции получателей сегмента; множество строится один раз на запуск задания"""
+    async with AsyncSessionLocal() as session:
+        segment = await build_segment(session, spec)
+    for page in segment.pages(after, chunk_size):
+        yield page
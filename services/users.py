@@ -0,0 +1,94 @@
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from aiogram.types import User as TelegramUser
+from sqlalchemy import or_
+
+from config import settings
+from database.dialect import insert
+from database.engine import AsyncSessionLocal
+from database.models import User
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileCache:
+    """
+    LRU недавно сохранённых профилей: tg_id -> (username, имя, фамилия).
+    Повторный /start с теми же данными не идёт в БД. deactivate_users очищает записи только
+    своего экземпляра, поэтому ttl короткий: кэш гасит серии нажатий /start, а не хранит профиль.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[int, tuple[tuple, float]] = OrderedDict()
+
+    def is_known(self, tg_id: int, fingerprint: tuple) -> bool:
+        entry = self._entries.get(tg_id)
+        if entry is None:
+            return False
+        cached, saved_at = entry
+        if cached != fingerprint or time.monotonic() - saved_at > self.ttl:
+            del self._entries[tg_id]
+            return False
+        self._entries.move_to_end(tg_id)
+        return True
+
+    def remember(self, tg_id: int, fingerprint: tuple):
+        self._entries[tg_id] = (fingerprint, time.monotonic())
+        self._entries.move_to_end(tg_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, tg_ids):
+        for tg_id in tg_ids:
+            self._entries.pop(tg_id, None)
+
+
+profile_cache = ProfileCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL)
+
+
+async def register_user(from_user: TelegramUser):
+    """
+    Сохраняет пользователя одним INSERT ... ON CONFLICT (tg_id) DO UPDATE.
+    Строка переписывается, только если изменились username/имя/фамилия
+    или пользователь был отключён от рассылок.
+    """
+    fingerprint = (from_user.username, from_user.first_name, from_user.last_name)
+    if profile_cache.is_known(from_user.id, fingerprint):
+        return
+
+    now = datetime.utcnow()
+    stmt = insert(User).values(
+        tg_id=from_user.id,
+        username=from_user.username,
+        first_name=from_user.first_name,
+        last_name=from_user.last_name,
+        is_active=True,
+        created_at=now,
+        updated_at=now,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[User.tg_id],
+        set_={
+            "username": stmt.excluded.username,
+            "first_name": stmt.excluded.first_name,
+            "last_name": stmt.excluded.last_name,
+            "is_active": True,  # Вернулся после блокировки бота — снова получает рассылки
+            "updated_at": now,
+        },
+        where=or_(
+            User.username.is_distinct_from(stmt.excluded.username),
+            User.first_name.is_distinct_from(stmt.excluded.first_name),
+            User.last_name.is_distinct_from(stmt.excluded.last_name),
+            User.is_active.is_not(True),
+        ),
+    )
+    async with AsyncSessionLocal() as session:
+        await session.execute(stmt)
+        await session.commit()
+    profile_cache.remember(from_user.id, fingerprint)
+    logger.info("Сохранён пользователь: %s (@%s)", from_user.id, from_user.username)